@@ -0,0 +1,180 @@
+"""Benchmark: validation phases over a synthetic registry.
+
+Writes a registry of N tables x M columns with K metric calculations per
+semantics file and E injected errors (see ``synthetic_registry.py``), then
+times each phase separately, best of ``--repeat`` runs with cold caches:
+
+    load          ruamel parse of every schema and semantics file
+    format        pydantic format validation (schema_main / semantic_main)
+    ddl_parse     DDL parsing into a DDLIndex per table
+    ddl_validate  schema-vs-DDL comparison
+    semantic      semantics reference validation against resolved sources
+    decipher      turning every raw error into a located message
+
+Error deciphering is recorded during the validation phases and replayed in
+its own phase, so it is not counted twice. Results are printed as a table
+and, with ``--output``, written as JSON for comparison across commits.
+
+    python benchmarks/bench_registry.py [--tables 200] [--columns 40] [--calculations 10] [--errors 20]
+                                        [--repeat 3] [--output results.json] [--keep DIR]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# Measure parsing itself, not the on-disk parse cache.
+os.environ.setdefault("PYVALIDATOR_NO_CACHE", "1")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyvalidator.schema_validator as schema_validator  # noqa: E402
+import pyvalidator.semantic_validator as semantic_validator  # noqa: E402
+from pyvalidator.ddl_index import DDLIndex  # noqa: E402
+from pyvalidator.document_cache import document_cache, load_yaml  # noqa: E402
+from pyvalidator.format_validator import schema_main, semantic_main  # noqa: E402
+from pyvalidator.helpers import decipher_error_messages, set_section_output  # noqa: E402
+from pyvalidator.semantic_validator import SemanticsValidator  # noqa: E402
+from pyvalidator.source_graph import SourceGraph  # noqa: E402
+from synthetic_registry import write_registry  # noqa: E402
+
+PHASES = ("load", "format", "ddl_parse", "ddl_validate", "semantic", "decipher")
+
+
+class _Recorder():
+    """Stands in for decipher_error_messages inside the validators and keeps the raw errors."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, yaml_path, errors):
+        self.calls.append((yaml_path, list(errors)))
+        return [error.get("msg", "") for error in errors]
+
+
+def run_once(root, names):
+    document_cache.invalidate()
+    recorder = _Recorder()
+    timings = {}
+    counts = {}
+    schema_paths = [os.path.join(root, "schema", name + ".yaml") for name in names]
+    semantic_paths = [os.path.join(root, "semantics", name + ".yaml") for name in names]
+
+    start = time.perf_counter()
+    for path in schema_paths + semantic_paths:
+        load_yaml(path)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    format_ok = []
+    counts["format"] = 0
+    for path in schema_paths:
+        errors = schema_main(path)
+        if errors:
+            recorder(path, errors)
+            counts["format"] += len(errors)
+        format_ok.append(not errors)
+    for path in semantic_paths:
+        errors = semantic_main(path)
+        if errors:
+            recorder(path, errors)
+            counts["format"] += len(errors)
+    timings["format"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexes = [DDLIndex.from_file(os.path.join(root, "ddl", name + ".sql")) for name in names]
+    timings["ddl_parse"] = time.perf_counter() - start
+
+    schema_validator.decipher_error_messages = recorder
+    semantic_validator.decipher_error_messages = recorder
+    try:
+        start = time.perf_counter()
+        counts["ddl"] = 0
+        for path, index, ok in zip(schema_paths, indexes, format_ok):
+            if ok:
+                counts["ddl"] += len(schema_validator.SchemaValidator(ddl_index=index).validate_schema(path) or [])
+        timings["ddl_validate"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph = SourceGraph.from_registry(root, names)
+        counts["semantic"] = 0
+        for path in semantic_paths:
+            errors = SemanticsValidator(source_graph=graph).validate_semantics(root, path)
+            counts["semantic"] += len(errors or [])
+        timings["semantic"] = time.perf_counter() - start
+    finally:
+        schema_validator.decipher_error_messages = decipher_error_messages
+        semantic_validator.decipher_error_messages = decipher_error_messages
+
+    start = time.perf_counter()
+    counts["decipher"] = sum(len(decipher_error_messages(path, errors)) for path, errors in recorder.calls)
+    timings["decipher"] = time.perf_counter() - start
+    return timings, counts
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--calculations", type=int, default=10)
+    parser.add_argument("--errors", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--keep", default=None, help="Write the registry to this directory and keep it")
+    args = parser.parse_args()
+
+    set_section_output(None)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.keep or tmp
+        expected = write_registry(root, args.tables, args.columns, args.calculations, args.errors, args.seed)
+        names = load_yaml(os.path.join(root, "registry.yml"))["registered_yml"]
+
+        runs = [run_once(root, names) for _ in range(args.repeat)]
+
+    counts = runs[-1][1]
+    for phase in ("format", "ddl", "semantic"):
+        if counts[phase] != expected[phase]:
+            print(f"warning: {phase} reported {counts[phase]} errors, expected {expected[phase]}", file=sys.stderr)
+
+    phases = {}
+    for phase in PHASES:
+        samples = [timings[phase] for timings, _ in runs]
+        phases[phase] = {"best_s": min(samples), "runs_s": samples}
+
+    results = {
+        "config": {"tables": args.tables, "columns": args.columns, "calculations": args.calculations,
+                   "errors": args.errors, "seed": args.seed, "repeat": args.repeat},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "commit": _commit()},
+        "phases": phases,
+        "errors": counts,
+        "expected_errors": expected,
+    }
+
+    files = 2 * args.tables
+    print(f"{args.tables} tables x {args.columns} columns, {args.calculations} calculations, "
+          f"{args.errors} injected errors; best of {args.repeat}\n")
+    for phase in PHASES:
+        best = phases[phase]["best_s"]
+        print(f"{phase:<14} {best * 1000:10.1f} ms   {best / files * 1e6:9.1f} us/file")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
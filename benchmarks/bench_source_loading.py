@@ -0,0 +1,94 @@
+"""Micro-benchmark: loading semantics sources as plain dicts.
+
+Compares the old ruamel load -> dump -> PyYAML re-parse round-trip with
+converting the cached ruamel document directly (``to_plain``) and with
+parsing through ruamel's YAML 1.2 safe loader when no ruamel parse is
+available.
+
+    python benchmarks/bench_source_loading.py [--repeat 20] [DIRECTORY]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from io import StringIO
+
+import yaml as pyyaml
+from ruamel.yaml import YAML
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyvalidator.document_cache import safe_load, to_plain  # noqa: E402
+
+
+def roundtrip(path):
+    yaml = YAML()
+    with open(path) as f:
+        source_raw = yaml.load(f)
+    buf = StringIO()
+    yaml.dump(source_raw, buf)
+    return pyyaml.safe_load(buf.getvalue())
+
+
+def ruamel_to_plain(path):
+    with open(path) as f:
+        return to_plain(YAML().load(f))
+
+
+def cached_to_plain(documents, path):
+    return to_plain(documents[path])
+
+
+def ruamel_safe_load(path):
+    with open(path) as f:
+        return safe_load(f)
+
+
+def timed(fn, paths, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "schema", "NBA")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=default_dir)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.y*ml")))
+    if not paths:
+        sys.exit(f"No YAML files in {args.directory}")
+
+    for path in paths:
+        if ruamel_to_plain(path) != roundtrip(path):
+            print(f"warning: to_plain differs from the round-trip for {path}")
+
+    documents = {}
+    for path in paths:
+        with open(path) as f:
+            documents[path] = YAML().load(f)
+
+    cases = [
+        ("ruamel load + dump + PyYAML load", roundtrip),
+        ("ruamel load + to_plain", ruamel_to_plain),
+        ("to_plain on cached document", lambda path: cached_to_plain(documents, path)),
+        ("ruamel safe load", ruamel_safe_load),
+    ]
+
+    print(f"{len(paths)} files from {args.directory}, best of {args.repeat}\n")
+    baseline = None
+    for label, fn in cases:
+        elapsed = timed(fn, paths, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<36} {elapsed * 1000:9.2f} ms   {baseline / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
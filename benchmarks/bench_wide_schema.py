@@ -0,0 +1,102 @@
+"""Micro-benchmark: schema-vs-DDL comparison on very wide tables.
+
+Builds a synthetic table with N columns (a few extra, missing and mistyped
+ones so every error kind is reported) and times ``SchemaValidator`` on it.
+The YAML document is loaded once beforehand, so the timings cover the
+pydantic model, the column/primary-key comparison and the error locations.
+Time per column should stay flat as N grows. ``--legacy`` also times the
+old per-column rebuild of the DDL column-name set for comparison.
+
+    python benchmarks/bench_wide_schema.py [--sizes 500,1000,2500,5000,10000] [--repeat 3] [--legacy]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import yaml as pyyaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyvalidator.ddl_index import DDLIndex  # noqa: E402
+from pyvalidator.document_cache import load_yaml  # noqa: E402
+from pyvalidator.schema_validator import SchemaValidator  # noqa: E402
+
+
+def wide_table(n_columns):
+    """DDL text and schema document for one table with ``n_columns`` columns."""
+    ddl_columns = ["id INT PRIMARY KEY"] + [f"c{i} VARCHAR(64)" for i in range(1, n_columns)]
+    ddl = f"CREATE TABLE wide_fact ({', '.join(ddl_columns)});"
+
+    columns = {"id": {"name": "Id", "type": "INT", "column": "id", "desc": "Row id", "primary_key": True}}
+    for i in range(1, n_columns):
+        columns[f"c{i}"] = {"name": f"C{i}", "type": "VARCHAR", "column": f"c{i}", "desc": f"Column {i}"}
+
+    # One error of each kind per thousand columns.
+    for i in range(1, n_columns, 1000):
+        columns[f"c{i}"]["type"] = "DATE"
+        columns.pop(f"c{i + 1}", None)
+        columns[f"extra{i}"] = {"name": f"Extra{i}", "type": "INT", "column": f"extra{i}", "desc": "Not in DDL"}
+
+    schema = {"wide_fact": {"subject_area": "wide fact", "table_info": [{"table": "wide_fact", "joins": []}],
+                            "columns": columns}}
+    return ddl, schema
+
+
+def legacy_extra_columns(schema_columns, ddl):
+    # The previous implementation rebuilt the DDL column set for every schema column.
+    return [name for name in schema_columns if name not in {col['name'] for col in ddl['columns']}]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="500,1000,2500,5000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy", action="store_true", help="Also time the old quadratic column check")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    header = f"{'columns':>8} {'validate ms':>12} {'us/column':>10} {'errors':>7}"
+    if args.legacy:
+        header += f" {'legacy check ms':>16}"
+    print(header)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_columns in sizes:
+            ddl, schema = wide_table(n_columns)
+            path = os.path.join(tmp, f"wide_{n_columns}.yml")
+            with open(path, "w") as f:
+                pyyaml.safe_dump(schema, f, sort_keys=False)
+
+            load_yaml(path)
+            validator = SchemaValidator(ddl_index=DDLIndex.from_ddl(ddl))
+            errors = []
+
+            def validate():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    errors[:] = validator.validate_schema(path) or []
+
+            elapsed = timed(validate, args.repeat)
+            line = f"{n_columns:>8} {elapsed * 1000:>12.1f} {elapsed / n_columns * 1e6:>10.2f} {len(errors):>7}"
+            if args.legacy:
+                table = validator.ddl_index.first().raw
+                schema_columns = {col["column"]: col for col in schema["wide_fact"]["columns"].values()}
+                legacy = timed(lambda: legacy_extra_columns(schema_columns, table), 1)
+                line += f" {legacy * 1000:>16.1f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
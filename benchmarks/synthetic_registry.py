@@ -0,0 +1,120 @@
+"""Synthetic metadata registries for benchmarks.
+
+``write_registry`` lays out ``ddl/``, ``schema/``, ``semantics/`` and
+``registry.yml`` for N tables of M columns. Every semantics file reads its
+table's schema and carries K metrics whose calculation and filter reference
+columns. E deliberately broken spots are spread round-robin over the files,
+each producing exactly one error in one validation phase. As in the
+runner, a schema that fails format validation is not compared with its DDL.
+"""
+import os
+import random
+
+import yaml
+
+DDL_TYPES = [("VARCHAR(64)", "VARCHAR"), ("INT", "INT"), ("DECIMAL(12,2)", "NUMBER"), ("DATE", "DATE")]
+
+# Kind of each injected error, in round-robin order, and the phase that reports it.
+ERROR_KINDS = [
+    ("type_mismatch", "ddl"),
+    ("unknown_reference", "semantic"),
+    ("extra_column", "ddl"),
+    ("missing_desc", "format"),
+]
+
+
+def table_name(index: int) -> str:
+    return f"t{index:05d}"
+
+
+def _ddl(name, columns, parent):
+    lines = ["    id INT PRIMARY KEY"]
+    for j in range(1, columns):
+        lines.append(f"    c{j} {DDL_TYPES[j % len(DDL_TYPES)][0]}")
+    if parent:
+        lines.append(f"    p_id INT REFERENCES {parent}(id)")
+    return f"CREATE TABLE {name} (\n" + ",\n".join(lines) + "\n);\n"
+
+
+def _schema(name, columns, parent):
+    body = {
+        "subject_area": f"synthetic {name}",
+        "table_info": [{"table": name, "joins": [{"join": parent, "on": f"{name}.p_id = {parent}.id"}] if parent else []}],
+        "columns": {"id": {"name": "Id", "type": "INT", "column": "id", "desc": "Row id", "primary_key": True}},
+    }
+    for j in range(1, columns):
+        body["columns"][f"c{j}"] = {"name": f"C{j}", "type": DDL_TYPES[j % len(DDL_TYPES)][1],
+                                    "column": f"c{j}", "desc": f"Column {j} of {name}"}
+    if parent:
+        body["columns"]["p_id"] = {"name": "Parent", "type": "INT", "column": "p_id", "desc": "Parent row"}
+    return {name: body}
+
+
+def _semantics(name, columns, calculations, rng):
+    body = {"folder": "synthetic", "type": "measure", "source": {f"schema.{name}": {"columns": ["<all>"]}},
+            "attributes": {}, "metrics": {}}
+    for j in range(1, min(columns, 6)):
+        body["attributes"][f"attr_c{j}"] = {"name": f"C{j}", "description": f"Attribute over c{j}",
+                                           "include": [f"c{j}"]}
+    for k in range(calculations):
+        a, b, c = (rng.randrange(1, columns) if columns > 1 else 0 for _ in range(3))
+        body["metrics"][f"metric_{k}"] = {
+            "name": f"Metric {k}",
+            "description": f"Synthetic metric {k}",
+            "calculation": f"SUM([{_col(a)}]) / NULLIF(COUNT([{_col(b)}]), 0)",
+            "filter": [f"[{_col(c)}] IS NOT NULL"],
+        }
+    return {name: body}
+
+
+def _col(j):
+    return f"c{j}" if j else "id"
+
+
+def write_registry(root: str, tables: int, columns: int, calculations: int, errors: int = 0,
+                   seed: int = 0) -> dict:
+    """Write a synthetic registry under ``root`` and return how many errors each phase should report."""
+    rng = random.Random(seed)
+    columns = max(columns, 2)
+    for folder in ("ddl", "schema", "semantics"):
+        os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    injected = {}
+    for e in range(errors):
+        injected.setdefault(e % tables, []).append(ERROR_KINDS[(e // tables) % len(ERROR_KINDS)][0])
+
+    expected = {phase: 0 for _, phase in ERROR_KINDS}
+    names = []
+    for i in range(tables):
+        name = table_name(i)
+        parent = table_name(i - 1) if i else None
+        names.append(name)
+        schema = _schema(name, columns, parent)
+        semantics = _semantics(name, columns, calculations, rng)
+
+        kinds = injected.get(i, [])
+        for kind in kinds:
+            phase = dict(ERROR_KINDS)[kind]
+            if not (phase == "ddl" and "missing_desc" in kinds):
+                expected[phase] += 1
+            if kind == "missing_desc":
+                del schema[name]["columns"]["id"]["desc"]
+            elif kind == "type_mismatch":
+                schema[name]["columns"]["c1"]["type"] = "DATE"
+            elif kind == "extra_column":
+                schema[name]["columns"]["not_in_ddl"] = {"name": "Extra", "type": "INT", "column": "not_in_ddl",
+                                                         "desc": "Missing from the DDL"}
+            elif kind == "unknown_reference":
+                semantics[name]["attributes"]["broken"] = {"name": "Broken", "description": "Bad include",
+                                                           "include": ["no_such_column"]}
+
+        with open(os.path.join(root, "ddl", name + ".sql"), "w") as f:
+            f.write(_ddl(name, columns, parent))
+        with open(os.path.join(root, "schema", name + ".yaml"), "w") as f:
+            yaml.safe_dump(schema, f, sort_keys=False)
+        with open(os.path.join(root, "semantics", name + ".yaml"), "w") as f:
+            yaml.safe_dump(semantics, f, sort_keys=False)
+
+    with open(os.path.join(root, "registry.yml"), "w") as f:
+        yaml.safe_dump({"registered_yml": names}, f, sort_keys=False)
+    return expected
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+from generator.schema_generator import SchemaGenerator
+
+
+DEFAULT_OUTPUT_DIR = os.path.join("generator", "output", "schema")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m generator",
+                                     description="Generate schema YAML files from a DDL file, one table at a time.")
+    parser.add_argument("ddl_path", help="DDL file with CREATE TABLE statements")
+    parser.add_argument("--domain", required=True,
+                        help="Output folder name under the output directory")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help=f"Root output directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Describe up to this many columns per model request")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Regenerate tables whose output file already exists")
+    parser.add_argument("--validate", action="store_true",
+                        help="Validate each schema in memory against the DDL and only write the ones that pass")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Processes used to parse the DDL statements (default: 1)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    output_dir = os.path.join(args.output_dir, args.domain)
+    generator = SchemaGenerator()
+    for path in generator.generate_to_directory(ddl_path=args.ddl_path, output_dir=output_dir,
+                                                batch_size=args.batch_size, overwrite=args.overwrite,
+                                                validate=args.validate, workers=args.workers):
+        print(f"Wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
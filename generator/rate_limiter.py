@@ -0,0 +1,128 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket():
+    """Thread-safe token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    ``reserve`` takes the tokens immediately (the level may go negative) and
+    returns how long the caller must wait, so concurrent callers queue up in
+    arrival order instead of racing for the next refill.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= amount
+            if self.level >= 0:
+                return 0.0
+            return -self.level / self.rate
+
+
+class RunMetrics():
+    """Per-run counters for model requests."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.wait_time = 0.0
+        self.backoff_time = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, requests: int = 0, retries: int = 0, wait_time: float = 0.0, backoff_time: float = 0.0):
+        with self._lock:
+            self.requests += requests
+            self.retries += retries
+            self.wait_time += wait_time
+            self.backoff_time += backoff_time
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self.started
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limit_wait_s": round(self.wait_time, 3),
+            "backoff_wait_s": round(self.backoff_time, 3),
+            "elapsed_s": round(elapsed, 3),
+            "requests_per_min": round(self.requests / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        }
+
+
+class RateLimiter():
+    """Client-side requests/min and tokens/min limits shared by every worker of a run."""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.metrics = RunMetrics()
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        self.metrics.record(requests=1, wait_time=wait)
+        return wait
+
+    def acquire(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def estimate_tokens(prompt: str) -> int:
+    # Roughly four characters per token for English prompts.
+    return max(1, len(prompt) // 4)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for the given (zero-based) retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _seconds(value) -> Optional[float]:
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)s?\s*", str(value))
+    return float(match.group(1)) if match else None
+
+
+def retry_after(error) -> Optional[float]:
+    """Server-suggested delay from a ``google.genai`` API error, if it carries one.
+
+    Looks at the ``google.rpc.RetryInfo`` detail of the error body and then
+    at a ``Retry-After`` response header.
+    """
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        for detail in (details.get("error") or {}).get("details") or []:
+            if isinstance(detail, dict) and "retryDelay" in detail:
+                delay = _seconds(detail["retryDelay"])
+                if delay is not None:
+                    return delay
+
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            return _seconds(headers.get("retry-after"))
+        except Exception:
+            return None
+    return None
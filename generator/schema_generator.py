@@ -1,18 +1,55 @@
-from simple_ddl_parser import DDLParser
-from pyvalidator.format_validator import GeneratedSchema
-from typing import Dict, List
+from pyvalidator.format_validator import GeneratedSchema, validate_schema_format
+from pyvalidator.ddl_index import DDLIndex, iter_ddl_file_tables, iter_ddl_tables
+from pyvalidator.document_source import DocumentSource
+from pyvalidator.schema_validator import SchemaValidator
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import re
+import tempfile
 import yaml
 # from decouple import config
 from google import genai
 from dotenv import load_dotenv
 import os
 import time
-from google.genai.errors import ClientError
+from google.genai.errors import APIError
+from generator.response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from generator.rate_limiter import RateLimiter, backoff_delay, estimate_tokens, retry_after
 
 
 # config = Config('.env')
 
 
+def schema_output_path(output_dir: str, table_name: str) -> str:
+    return os.path.join(output_dir, f"{table_name}.yaml")
+
+
+def write_schema(path: str, table_name: str, schema: GeneratedSchema):
+    """Write `{table_name: schema}` as YAML atomically, so a crash never leaves a partial file."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".yaml")
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.dump({table_name: schema.model_dump()}, f, sort_keys=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def validate_generated_schema(table_name: str, schema: GeneratedSchema, ddl_index: DDLIndex,
+                              path: Optional[str] = None) -> List[str]:
+    """Check a generated schema in memory exactly as its file would be checked: format, then against the DDL.
+
+    `path` only labels the messages; nothing is read or written.
+    """
+    source = DocumentSource.from_model(schema, table_name, path=path)
+    errors = validate_schema_format(source)
+    if not errors:
+        errors = SchemaValidator(ddl_index=ddl_index).validate_schema(source)
+    return errors or []
 
 
 class SchemaGenerator():
@@ -20,11 +57,21 @@ class SchemaGenerator():
     load_dotenv()
     GEMINI_API_KEY = os.getenv("API_KEY")
     MODEL = os.getenv("MODEL")
+    REQUESTS_PER_MINUTE = float(os.getenv("REQUESTS_PER_MINUTE", 0)) or None
+    TOKENS_PER_MINUTE = float(os.getenv("TOKENS_PER_MINUTE", 0)) or None
+    RETRYABLE_CODES = {429, 500, 503}
     
     
-    def __init__(self):
+    def __init__(self, client=None, cache: ResponseCache = None, rate_limiter: RateLimiter = None):
         self.schema = None
-        self.llm = genai.Client(api_key=self.GEMINI_API_KEY)
+        # Any object exposing genai.Client's `models` / `aio.models` interface works here.
+        self.llm = client if client is not None else genai.Client(api_key=self.GEMINI_API_KEY)
+        # Responses are memoized on disk unless GENERATOR_NO_CACHE is set.
+        if cache is None and not os.getenv("GENERATOR_NO_CACHE"):
+            cache = ResponseCache(os.getenv("GENERATOR_CACHE_PATH", DEFAULT_CACHE_PATH))
+        self.cache = cache
+        # One limiter per generator, shared by every thread / task it runs.
+        self.rate_limiter = rate_limiter or RateLimiter(self.REQUESTS_PER_MINUTE, self.TOKENS_PER_MINUTE)
         
         
     def generate_subject_area_prompt(self, table_name: str, column_names: list[str], column_descriptions: list[str]) -> str:
@@ -61,99 +108,338 @@ class SchemaGenerator():
     What does this column likely represent? Respond with only the description."""
 
     
-    def generate_content(self, prompt:str, delay = 60, retires = 3) -> str:
-        # prompt = self.generate_column_description_prompt(prompt)
-        if retires == 0 :
-            raise ValueError(f"Retries exhausted")
+    def generate_column_descriptions_prompt(self, table_name: str, columns: List[Tuple[str, str]]) -> str:
+        column_info = "\n".join(f"- {name} ({data_type})" for name, data_type in columns)
+        return f"""You are a data analyst. Provide a brief description (5-12 words) for each database column below.
+
+    Table: {table_name}
+
+    Columns:
+    {column_info}
+
+    Respond with only a JSON object mapping every column name to its description."""
+
+
+    def parse_column_descriptions(self, response: str, column_names: List[str]) -> Dict[str, str]:
+        """Pull per-column descriptions out of a batched answer.
+
+        Accepts a JSON object (optionally inside a code fence) or `name: description`
+        lines. Columns the model skipped are left out of the result.
+        """
+        text = response.strip()
+        fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        if fenced:
+            text = fenced.group(1).strip()
+
         try:
-            response = self.llm.models.generate_content(
-                model=self.MODEL, contents=prompt
-            )
-        except ClientError as e:
-            if e.code == 429:
-                print(f"Quota exceeded, retyring in {delay} seconds ...")
-                time.sleep(delay)
-                return self.generate_content(prompt, retires= retires -1)
-            else:
-                raise e
-        return response.text.replace('"','').strip()
+            answers = json.loads(text)
+        except ValueError:
+            answers = {}
+            for line in text.splitlines():
+                name, sep, desc = line.strip().lstrip("-* ").partition(":")
+                if sep:
+                    answers[name.strip().strip('"')] = desc
+
+        if not isinstance(answers, dict):
+            return {}
+        wanted = set(column_names)
+        return {
+            str(name): str(desc).replace('"', '').strip()
+            for name, desc in answers.items()
+            if name in wanted and str(desc).strip()
+        }
+
+    
+    def _retry_delay(self, error: APIError, attempt: int, max_delay: float) -> float:
+        hint = retry_after(error)
+        delay = hint if hint is not None else backoff_delay(attempt, cap=max_delay)
+        self.rate_limiter.metrics.record(retries=1, backoff_time=delay)
+        print(f"Request failed with {error.code}, retrying in {delay:.1f} seconds ...")
+        return delay
+
+    def generate_text(self, prompt:str, delay = 60, retires = 3) -> str:
+        """Return the model's raw answer to `prompt`.
+
+        Requests go through the shared rate limiter. Retryable errors (429/5xx) are
+        retried up to `retires` times, waiting for the server's retry hint when it
+        sends one and otherwise for a jittered exponential backoff capped at `delay`.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.MODEL, prompt)
+            if cached is not None:
+                return cached
+        last_error = None
+        for attempt in range(retires):
+            self.rate_limiter.acquire(estimate_tokens(prompt))
+            try:
+                response = self.llm.models.generate_content(
+                    model=self.MODEL, contents=prompt
+                )
+            except APIError as e:
+                if e.code not in self.RETRYABLE_CODES:
+                    raise e
+                last_error = e
+                if attempt < retires - 1:
+                    time.sleep(self._retry_delay(e, attempt, delay))
+                continue
+            if self.cache is not None:
+                self.cache.put(self.MODEL, prompt, response.text)
+            return response.text
+        raise ValueError("Retries exhausted") from last_error
+
+    def generate_content(self, prompt:str, delay = 60, retires = 3) -> str:
+        return self.generate_text(prompt, delay=delay, retires=retires).replace('"','').strip()
     
         
-    def generate(self, ddl: str) -> Dict[str,GeneratedSchema]:
+    def _undescribed_columns(self, table_dict: Dict) -> List[Tuple[str, str]]:
+        return [
+            (col["name"], col["type"])
+            for col in table_dict["columns"]
+            if not ("comment" in col and col["comment"])
+        ]
+
+    def _batches(self, columns: List[Tuple[str, str]], batch_size: int) -> List[List[Tuple[str, str]]]:
+        return [columns[i:i + batch_size] for i in range(0, len(columns), batch_size)]
+
+    def _describe_columns(self, table_name: str, columns: List[Tuple[str, str]], batch_size: Optional[int]) -> Dict[str, str]:
+        descriptions = {}
+        if batch_size:
+            for batch in self._batches(columns, batch_size):
+                prompt = self.generate_column_descriptions_prompt(table_name=table_name, columns=batch)
+                descriptions.update(self.parse_column_descriptions(self.generate_text(prompt), [name for name, _ in batch]))
+
+        # One request per column, either by choice or for columns a batch answer missed.
+        for column, data_type in columns:
+            if column not in descriptions:
+                prompt = self.generate_column_description_prompt(column_name=column,table_name=table_name,data_type=data_type)
+                descriptions[column] = self.generate_content(prompt)
+        return descriptions
+
+    def _table_columns(self, table_dict: Dict, descriptions: Dict[str, str]) -> Tuple[List[Dict], List[Dict]]:
+        table_name = table_dict["table_name"]
+        joins = []
+        columns = []
         
-        parsed_ddl = DDLParser(ddl).run(output_mode="hql")
-        result ={}
+        if table_dict["primary_key"] != []:
+            primary_key = table_dict["primary_key"][0]
+        else:
+            primary_key = ""
         
-        for table_dict in parsed_ddl:
-            if "table_name" not in table_dict:
-                continue
-            print(table_dict)
-            table_name = table_dict["table_name"]
-            joins = []
-            columns = []
-            
-            if table_dict["primary_key"] != []:
-                primary_key = table_dict["primary_key"][0]
+        for col in table_dict["columns"]:
+            column = col["name"]
+            type = col["type"]
+            if "comment" in col and col["comment"]:
+                desc = col["comment"]
             else:
-                primary_key = ""
-            
-            for col in table_dict["columns"]:
-                column = col["name"]
-                type = col["type"]
-                if "comment" in col and col["comment"]:
-                    desc = col["comment"]
-                else:
-                    prompt = self.generate_column_description_prompt(column_name=column,table_name=table_name,data_type=type)
-                    desc = self.generate_content(prompt)
-                    
-                if "references" in col and col["references"]:   
-                    foreign_key = True
-                    reference_table = col["references"].get("table")
-                    reference_col = col["references"].get("column")
-                    join_condition = f"{table_name}.{column} = {reference_table}.{reference_col}"
-                    joins.append(join_condition)
-                else:
-                    foreign_key = False
-                    
-                # if "contraints" in col and col["contraints"]:
-                #     if "references" in col["contraints"] and col["contraints"].get("references"):
-                #         references = col["contraints"].get("references")
-                #         for reference in references:
-                #             foreign_key = True
-                #             reference_table = reference["references"].get("table")
-                #             reference_col = reference["references"].get("columns")[0]
-                #             join_condition = f"{table_name}.{column} = {reference_table}.{reference_col}"
-                #             joins.append(join_condition)
-                        
-                                    
-                columns.append(
-                    {
-                        "name": column,
-                        "type": type,
-                        "column": column,
-                        "desc": desc,
-                        "primary_key": (column == primary_key),
-                        "foreign_key": foreign_key
-                    }
-                )
+                desc = descriptions[column]
                 
-            subject_area_prompt = self.generate_subject_area_prompt(table_name=table_name,column_names=[col["name"] for col in columns],column_descriptions=[col["desc"] for col in columns])
+            if "references" in col and col["references"]:   
+                foreign_key = True
+                reference_table = col["references"].get("table")
+                reference_col = col["references"].get("column")
+                join_condition = f"{table_name}.{column} = {reference_table}.{reference_col}"
+                joins.append({"join": reference_table, "on": join_condition})
+            else:
+                foreign_key = False
                 
-            table_schema = GeneratedSchema(
-                subject_area= self.generate_content(subject_area_prompt),
-                table_info= [{
-                    "table": table_name,
-                    "joins": joins,
-                }],
-                columns = {col["column"]: col for col in columns}
+            # if "contraints" in col and col["contraints"]:
+            #     if "references" in col["contraints"] and col["contraints"].get("references"):
+            #         references = col["contraints"].get("references")
+            #         for reference in references:
+            #             foreign_key = True
+            #             reference_table = reference["references"].get("table")
+            #             reference_col = reference["references"].get("columns")[0]
+            #             join_condition = f"{table_name}.{column} = {reference_table}.{reference_col}"
+            #             joins.append(join_condition)
+                    
+                                
+            columns.append(
+                {
+                    "name": column,
+                    "type": type,
+                    "column": column,
+                    "desc": desc,
+                    "primary_key": (column == primary_key),
+                    "foreign_key": foreign_key
+                }
             )
+        return columns, joins
+
+    def _table_schema(self, table_name: str, columns: List[Dict], joins: List[Dict], subject_area: str) -> GeneratedSchema:
+        return GeneratedSchema(
+            subject_area= subject_area,
+            table_info= [{
+                "table": table_name,
+                "joins": joins,
+            }],
+            columns = {col["column"]: col for col in columns}
+        )
+
+    def _subject_area_prompt(self, table_name: str, columns: List[Dict]) -> str:
+        return self.generate_subject_area_prompt(table_name=table_name,column_names=[col["name"] for col in columns],column_descriptions=[col["desc"] for col in columns])
+
+    def _ddl_tables(self, ddl: str = None, ddl_index: DDLIndex = None, ddl_path: str = None,
+                    workers: int = 1) -> Iterator[Dict]:
+        # DDL text and files are parsed one CREATE TABLE (with its ALTERs) at a time, as the tables are consumed.
+        if ddl_index is not None:
+            tables = (table.raw for table in ddl_index)
+        elif ddl_path is not None:
+            tables = iter_ddl_file_tables(ddl_path, workers, batch_statements=1)
+        else:
+            tables = iter_ddl_tables(ddl, workers, batch_statements=1)
+        return (table_dict for table_dict in tables if "table_name" in table_dict)
+
+    def iter_generate(self, ddl: str = None, ddl_index: DDLIndex = None, batch_size: Optional[int] = None,
+                      skip: Callable[[str], bool] = None, ddl_path: str = None) -> Iterator[Tuple[str, GeneratedSchema]]:
+        """Yield `(table_name, schema)` for each DDL table as soon as it is generated.
+
+        The DDL comes from `ddl` text, a `ddl_path` file or a prepared `ddl_index`.
+        Text and files are parsed table by table, so nothing is kept between
+        tables. Tables for which `skip(table_name)` is true are passed over
+        before any model call, which is how interrupted runs resume.
+        """
+        for table_dict, table_schema in self._generate_tables(self._ddl_tables(ddl, ddl_index, ddl_path),
+                                                              batch_size, skip):
+            yield table_dict["table_name"], table_schema
+
+    def _generate_tables(self, tables: Iterable[Dict], batch_size: Optional[int],
+                         skip: Callable[[str], bool] = None) -> Iterator[Tuple[Dict, GeneratedSchema]]:
+        for table_dict in tables:
+            table_name = table_dict["table_name"]
+            if skip is not None and skip(table_name):
+                continue
+            print(table_dict)
+
+            descriptions = self._describe_columns(table_name, self._undescribed_columns(table_dict), batch_size)
+            columns, joins = self._table_columns(table_dict, descriptions)
+                
+            subject_area_prompt = self._subject_area_prompt(table_name, columns)
+            table_schema = self._table_schema(table_name, columns, joins, self.generate_content(subject_area_prompt))
             
 
             print(table_schema)
         
-            result[table_name] = table_schema
-            
+            yield table_dict, table_schema
+
+    def generate(self, ddl: str = None, ddl_index: DDLIndex = None, batch_size: Optional[int] = None) -> Dict[str,GeneratedSchema]:
+        """Generate a schema per DDL table.
+
+        With `batch_size`, descriptions for up to that many columns are requested
+        in a single prompt instead of one request per column.
+        """
+        result = dict(self.iter_generate(ddl=ddl, ddl_index=ddl_index, batch_size=batch_size))
+        print(self.rate_limiter.metrics.summary())
         return result
 
+    def generate_to_directory(self, ddl: str = None, output_dir: str = None, batch_size: Optional[int] = None,
+                              overwrite: bool = False, ddl_index: DDLIndex = None, validate: bool = False,
+                              ddl_path: str = None, workers: int = 1) -> Iterator[str]:
+        """Write `<output_dir>/<table>.yaml` for each table as it completes and yield its path.
+
+        Tables whose file already exists are skipped unless `overwrite` is set.
+        With `validate`, each schema is first validated in memory against its
+        DDL table and not written if it fails, so a later run generates it again.
+        With `workers > 1` the next few tables of `ddl`/`ddl_path` are parsed
+        in worker processes while the current one is generated.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        def exists(table_name: str) -> bool:
+            return not overwrite and os.path.exists(schema_output_path(output_dir, table_name))
+
+        tables = self._ddl_tables(ddl, ddl_index, ddl_path, workers)
+        for table_dict, table_schema in self._generate_tables(tables, batch_size, skip=exists):
+            table_name = table_dict["table_name"]
+            path = schema_output_path(output_dir, table_name)
+            if validate:
+                errors = validate_generated_schema(table_name, table_schema, DDLIndex([table_dict]), path=path)
+                if errors:
+                    print(f"Not writing {path}: {len(errors)} validation error(s)")
+                    continue
+            write_schema(path, table_name, table_schema)
+            yield path
+        print(self.rate_limiter.metrics.summary())
+
+    async def agenerate_text(self, prompt: str, delay = 60, retires = 3) -> str:
+        if self.cache is not None:
+            cached = self.cache.get(self.MODEL, prompt)
+            if cached is not None:
+                return cached
+        last_error = None
+        for attempt in range(retires):
+            await self.rate_limiter.aacquire(estimate_tokens(prompt))
+            try:
+                response = await self.llm.aio.models.generate_content(
+                    model=self.MODEL, contents=prompt
+                )
+            except APIError as e:
+                if e.code not in self.RETRYABLE_CODES:
+                    raise e
+                last_error = e
+                if attempt < retires - 1:
+                    await asyncio.sleep(self._retry_delay(e, attempt, delay))
+                continue
+            if self.cache is not None:
+                self.cache.put(self.MODEL, prompt, response.text)
+            return response.text
+        raise ValueError("Retries exhausted") from last_error
+
+    async def agenerate_content(self, prompt: str, delay = 60, retires = 3) -> str:
+        return (await self.agenerate_text(prompt, delay=delay, retires=retires)).replace('"','').strip()
+
+    async def _alimited(self, requests: asyncio.Semaphore, call: Awaitable[str]) -> str:
+        async with requests:
+            return await call
+
+    async def _adescribe_columns(self, table_name: str, columns: List[Tuple[str, str]], batch_size: Optional[int],
+                                 requests: asyncio.Semaphore) -> Dict[str, str]:
+        descriptions = {}
+        if batch_size:
+            batches = self._batches(columns, batch_size)
+            answers = await asyncio.gather(*(
+                self._alimited(requests, self.agenerate_text(
+                    self.generate_column_descriptions_prompt(table_name=table_name, columns=batch)))
+                for batch in batches
+            ))
+            for batch, answer in zip(batches, answers):
+                descriptions.update(self.parse_column_descriptions(answer, [name for name, _ in batch]))
+
+        missing = [(column, data_type) for column, data_type in columns if column not in descriptions]
+        answers = await asyncio.gather(*(
+            self._alimited(requests, self.agenerate_content(
+                self.generate_column_description_prompt(column_name=column,table_name=table_name,data_type=data_type)))
+            for column, data_type in missing
+        ))
+        descriptions.update({column: answer for (column, _), answer in zip(missing, answers)})
+        return descriptions
+
+    async def _agenerate_table(self, table_dict: Dict, batch_size: Optional[int], semaphore: asyncio.Semaphore,
+                               requests: asyncio.Semaphore) -> GeneratedSchema:
+        async with semaphore:
+            table_name = table_dict["table_name"]
+            descriptions = await self._adescribe_columns(table_name, self._undescribed_columns(table_dict), batch_size,
+                                                         requests)
+            columns, joins = self._table_columns(table_dict, descriptions)
+            subject_area = await self._alimited(requests, self.agenerate_content(self._subject_area_prompt(table_name, columns)))
+            return self._table_schema(table_name, columns, joins, subject_area)
+
+    async def agenerate(self, ddl: str = None, ddl_index: DDLIndex = None, batch_size: Optional[int] = 50,
+                        max_concurrency: int = 8, max_requests: int = 16) -> Dict[str,GeneratedSchema]:
+        """Async counterpart of `generate` that works on up to `max_concurrency` tables at once.
+
+        At most `max_requests` model requests are in flight across all tables,
+        however many columns a table has.
+        """
+        if ddl_index is None:
+            ddl_index = DDLIndex.from_ddl(ddl)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        requests = asyncio.Semaphore(max_requests)
+
+        tables = [table.raw for table in ddl_index]
+        schemas = await asyncio.gather(*(
+            self._agenerate_table(table_dict, batch_size, semaphore, requests) for table_dict in tables
+        ))
+        print(self.rate_limiter.metrics.summary())
+        return {table_dict["table_name"]: schema for table_dict, schema in zip(tables, schemas)}
+
         
-                
\ No newline at end of file
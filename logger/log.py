@@ -1,28 +1,119 @@
+import atexit
 import datetime
+import glob
 import logging
+import multiprocessing
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Union
+
+LOG_DIR = "logs"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DEFAULT_KEEP = 20
+
+_listener: Optional[QueueListener] = None
+_queue = None
+_handler: Optional[QueueHandler] = None
+
+
+def _log_file_name() -> str:
+    # No spaces or colons, so the name is valid on every filesystem and easy to glob.
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    return f"validation-{stamp}-{os.getpid()}.log"
+
+
+def _rotate(log_dir: str, keep: int):
+    """Delete the oldest run logs so at most ``keep`` remain, counting the one about to be created."""
+    logs = sorted(glob.glob(os.path.join(log_dir, "validation-*.log")), key=os.path.getmtime)
+    for path in logs[:max(0, len(logs) - keep + 1)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _make_queue():
+    # A multiprocessing queue lets forked pool workers log through the parent's listener.
+    try:
+        return multiprocessing.Queue(-1)
+    except (OSError, ImportError):
+        return queue.SimpleQueue()
+
+
+def setup_logging(level: Union[int, str, None] = None, log_dir: Optional[str] = None,
+                  keep: Optional[int] = None, stdout: bool = True) -> QueueListener:
+    """Route the root logger through a queue to a per-run log file and stdout.
+
+    Emitting a record only enqueues it; a listener thread does the formatting
+    and the disk writes. The level defaults to ``PYVALIDATOR_LOG_LEVEL`` (or
+    INFO), and only the newest ``keep`` run logs (``PYVALIDATOR_LOG_KEEP``,
+    default 20) are kept in ``log_dir``. Calling it again returns the running
+    listener.
+    """
+    global _listener, _queue, _handler
+    if _listener is not None:
+        return _listener
+
+    level = level or os.environ.get("PYVALIDATOR_LOG_LEVEL") or logging.INFO
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level '{level}'")
+    log_dir = log_dir or os.environ.get("PYVALIDATOR_LOG_DIR") or LOG_DIR
+    keep = keep if keep is not None else int(os.environ.get("PYVALIDATOR_LOG_KEEP", DEFAULT_KEEP))
+
+    os.makedirs(log_dir, exist_ok=True)
+    _rotate(log_dir, keep)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.FileHandler(os.path.join(log_dir, _log_file_name()), delay=True)]
+    if stdout:
+        handlers.append(logging.StreamHandler(stream=sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _queue = _make_queue()
+    _listener = QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    _handler = QueueHandler(_queue)
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level)
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener."""
+    global _listener, _queue, _handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = _queue = _handler = None
+
+
+def log_queue():
+    """Queue of the running listener, to hand to ``init_worker_logging`` in spawned workers."""
+    return _queue
+
+
+def init_worker_logging(log_queue, level: Union[int, str] = logging.INFO):
+    """Pool initializer: send this worker's records to the parent's listener."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
 
-# Define the log directory and file name
-log_dir = "logs"
-log_file = f"validation-{datetime.datetime.now()}.log"
-log_file_path =os.path.join(log_dir, log_file)
-
-# Create the log directory if it doesn't exist
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-# Set up logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file_path),
-        logging.StreamHandler(stream=sys.stdout)
-    ]
-)
 
 # Create a logger object
 def create_logger():
+    setup_logging()
     logger = logging.getLogger(__name__)
-    return logger
\ No newline at end of file
+    return logger
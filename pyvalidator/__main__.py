@@ -0,0 +1,228 @@
+import argparse
+import os
+import signal
+import sys
+import threading
+
+from logger.log import create_logger, setup_logging, shutdown_logging
+from pyvalidator.helpers import set_section_output
+from pyvalidator.manifest import ValidationManifest
+from pyvalidator import profiling
+from pyvalidator.reporters import FORMATS, create_reporter
+from pyvalidator.results import summarize
+from pyvalidator.runner import KINDS, run_registry
+from pyvalidator.server import DEFAULT_HOST, DEFAULT_PORT, ValidationService, serve_http, serve_stdio
+from pyvalidator.type_system import DIALECT_TYPE_FAMILIES
+from pyvalidator.watch import DEFAULT_INTERVAL, ResultBroadcaster, WarmRegistry, create_watcher
+from pyvalidator.watch import watch as watch_registry
+
+
+DIALECTS = tuple(DIALECT_TYPE_FAMILIES)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m pyvalidator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Validate every entry in registry.yml")
+    run.add_argument("--metadata-path", default="./assets",
+                     help="Directory holding ddl/, schema/, semantics/ and registry.yml")
+    run.add_argument("--ddl-dir", default="ddl", help="DDL folder name inside the metadata path")
+    run.add_argument("--ddl-dump", default=None,
+                     help="Single DDL file holding every CREATE TABLE; overrides --ddl-dir")
+    run.add_argument("--dialect", choices=DIALECTS, default=None,
+                     help="SQL dialect whose type aliases schemas are compared with (default: generic)")
+    run.add_argument("--only", choices=KINDS, help="Validate only schemas or only semantics")
+    run.add_argument("-j", "--workers", type=int, default=None,
+                     help="Number of worker processes (default: CPU count)")
+    run.add_argument("--cache-dir", default=None,
+                     help="Directory for the persistent parse cache (default: .pyvalidator_cache)")
+    run.add_argument("--no-cache", action="store_true", help="Disable the persistent parse cache")
+    run.add_argument("--incremental", action="store_true",
+                     help="Only re-validate entries whose files or dependencies changed since the last run")
+    run.add_argument("--manifest", default=None,
+                     help="Manifest used by --incremental (default: <cache dir>/manifest.json)")
+    run.add_argument("--format", choices=FORMATS, default="pretty",
+                     help="pretty console sections (default), JSON lines streamed per issue, or a SARIF log")
+    run.add_argument("-o", "--output", default=None, help="Write the report to this file instead of stdout")
+    run.add_argument("--profile", action="store_true",
+                     help="Print a per-phase time breakdown and the slowest files to stderr")
+    run.add_argument("--profile-top", type=int, default=10, help="Number of slowest files listed by --profile")
+    run.add_argument("--profile-dump", default=None,
+                     help="With --profile, also write merged cProfile stats to this file (read with pstats)")
+    run.add_argument("--log-level", default=None,
+                     help="Logging level, e.g. DEBUG or WARNING (default: PYVALIDATOR_LOG_LEVEL or INFO)")
+    run.add_argument("--log-dir", default=None, help="Directory for the per-run log files (default: logs)")
+
+    watch = subparsers.add_parser("watch", help="Keep the registry loaded and re-validate files as they change")
+    watch.add_argument("--metadata-path", default="./assets",
+                       help="Directory holding ddl/, schema/, semantics/ and registry.yml")
+    watch.add_argument("--ddl-dir", default="ddl", help="DDL folder name inside the metadata path")
+    watch.add_argument("--ddl-dump", default=None,
+                       help="Single DDL file holding every CREATE TABLE; overrides --ddl-dir")
+    watch.add_argument("--dialect", choices=DIALECTS, default=None,
+                       help="SQL dialect whose type aliases schemas are compared with (default: generic)")
+    watch.add_argument("--only", choices=KINDS, help="Validate only schemas or only semantics")
+    watch.add_argument("--format", choices=("pretty", "jsonl"), default="pretty",
+                       help="pretty console sections (default) or JSON lines per issue")
+    watch.add_argument("--socket", default=None,
+                       help="Send JSON lines to clients of this local socket (host:port or a Unix socket path) "
+                            "instead of the console")
+    watch.add_argument("--polling", action="store_true",
+                       help="Poll for changes even when the watchdog package is installed")
+    watch.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Polling interval in seconds")
+    watch.add_argument("--log-level", default=None,
+                       help="Logging level, e.g. DEBUG or WARNING (default: PYVALIDATOR_LOG_LEVEL or INFO)")
+    watch.add_argument("--log-dir", default=None, help="Directory for the per-run log files (default: logs)")
+
+    serve = subparsers.add_parser("serve", help="Validate in-memory documents sent over HTTP or stdio")
+    serve.add_argument("--metadata-path", default="./assets",
+                       help="Directory holding ddl/, schema/, semantics/ and registry.yml")
+    serve.add_argument("--ddl-dir", default="ddl", help="DDL folder name inside the metadata path")
+    serve.add_argument("--ddl-dump", default=None,
+                       help="Single DDL file holding every CREATE TABLE; overrides --ddl-dir")
+    serve.add_argument("--dialect", choices=DIALECTS, default=None,
+                       help="SQL dialect whose type aliases schemas are compared with (default: generic)")
+    serve.add_argument("--host", default=DEFAULT_HOST, help=f"HTTP host (default: {DEFAULT_HOST})")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"HTTP port (default: {DEFAULT_PORT})")
+    serve.add_argument("--stdio", action="store_true",
+                       help="Speak JSON-RPC 2.0 over stdin/stdout, one message per line, instead of HTTP")
+    serve.add_argument("-j", "--workers", type=int, default=1,
+                       help="Worker processes validating requests concurrently (default: 1, in-process)")
+    serve.add_argument("--log-level", default=None,
+                       help="Logging level, e.g. DEBUG or WARNING (default: PYVALIDATOR_LOG_LEVEL or INFO)")
+    serve.add_argument("--log-dir", default=None, help="Directory for the per-run log files (default: logs)")
+    return parser
+
+
+def run(args) -> int:
+    setup_logging(level=args.log_level, log_dir=args.log_dir)
+    logger = create_logger()
+    kinds = (args.only,) if args.only else KINDS
+
+    # Exported through the environment so pool workers pick up the same settings.
+    if args.cache_dir:
+        os.environ["PYVALIDATOR_CACHE_DIR"] = args.cache_dir
+    if args.no_cache:
+        os.environ["PYVALIDATOR_NO_CACHE"] = "1"
+    if args.format != "pretty":
+        # Machine-readable reports carry everything; skip formatting the console sections.
+        os.environ["PYVALIDATOR_NO_SECTIONS"] = "1"
+        set_section_output(None)
+
+    if args.profile:
+        profiling.enable()
+        if args.profile_dump:
+            os.environ["PYVALIDATOR_PROFILE_DUMP"] = os.path.abspath(args.profile_dump)
+            profiling.discard_cprofile_parts(os.path.abspath(args.profile_dump))
+
+    manifest = None
+    if args.incremental:
+        manifest = ValidationManifest(args.manifest)
+
+    stream = open(args.output, "w") if args.output else sys.stdout
+    try:
+        reporter = create_reporter(args.format, stream, buffered=args.output is not None)
+        results = run_registry(args.metadata_path, kinds=kinds, workers=args.workers,
+                               ddl_dir=args.ddl_dir, ddl_dump=args.ddl_dump, manifest=manifest,
+                               on_result=reporter.report if reporter.streaming else None, dialect=args.dialect)
+        if manifest is not None:
+            manifest.save()
+
+        if not reporter.streaming:
+            for result in results:
+                reporter.report(result)
+        sys.stdout.flush()
+
+        if args.format == "pretty":
+            for result in results:
+                label = "Schema" if result["kind"] == "schema" else "Semantic"
+                for msg in result["errors"]:
+                    logger.error("%s: %s | %s", label, result["name"], msg)
+
+        # Drain the log queue so the error lines land before the summary.
+        shutdown_logging()
+        summary = summarize(results)
+        reporter.finish(summary)
+
+        if args.profile:
+            report = profiling.ProfileReport()
+            for result in results:
+                report.add(result)
+            sys.stderr.write(report.format(top=args.profile_top))
+            if args.profile_dump and profiling.merge_cprofile_dumps(os.path.abspath(args.profile_dump)):
+                sys.stderr.write(f"cProfile stats written to {args.profile_dump}\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 1 if summary["failed"] else 0
+
+
+def watch(args) -> int:
+    setup_logging(level=args.log_level, log_dir=args.log_dir)
+    logger = create_logger()
+    if args.format != "pretty" or args.socket:
+        os.environ["PYVALIDATOR_NO_SECTIONS"] = "1"
+        set_section_output(None)
+
+    registry = WarmRegistry(args.metadata_path, kinds=(args.only,) if args.only else KINDS,
+                            ddl_dir=args.ddl_dir, ddl_dump=args.ddl_dump, dialect=args.dialect)
+    roots = [args.metadata_path] + ([args.ddl_dump] if args.ddl_dump else [])
+    watcher = create_watcher(roots, interval=args.interval, polling=args.polling)
+    stream = ResultBroadcaster(args.socket) if args.socket else sys.stdout
+    output_format = "jsonl" if args.socket else args.format
+
+    def emit(results, seconds):
+        reporter = create_reporter(output_format, stream)
+        for result in results:
+            reporter.report(result)
+        reporter.finish(summarize(results))
+        logger.info("Validated %d entries in %.1f ms", len(results), seconds * 1000)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    logger.info("Watching %s for changes (%s). Press Ctrl+C to stop.", args.metadata_path, watcher.backend)
+    try:
+        watch_registry(registry, watcher, emit, stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+def serve(args) -> int:
+    # stdout carries the JSON-RPC messages in stdio mode, so logs only go to the file there.
+    setup_logging(level=args.log_level, log_dir=args.log_dir, stdout=not args.stdio)
+    service = ValidationService(args.metadata_path, ddl_dir=args.ddl_dir, ddl_dump=args.ddl_dump,
+                                workers=args.workers, dialect=args.dialect)
+    service.start()
+    # Shut the worker pool down cleanly on SIGTERM as well as on Ctrl+C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        if args.stdio:
+            serve_stdio(service)
+        else:
+            serve_http(service, args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    if args.command == "watch":
+        return watch(args)
+    if args.command == "serve":
+        return serve(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, Optional
+
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = ".pyvalidator_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _parser_version() -> str:
+    try:
+        return version("simple-ddl-parser")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class DDLCache():
+    """Content-addressed on-disk cache of ``DDLParser(...).run(output_mode="hql")`` output.
+
+    Entries live under ``<cache_dir>/ddl/<version tag>/<sha256>.pickle``. The
+    version tag combines the cache format and the installed simple-ddl-parser
+    version, so upgrading the parser starts from an empty cache. Once the
+    entries exceed ``max_bytes`` the least recently used ones are evicted.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = os.path.join(cache_dir or DEFAULT_CACHE_DIR, "ddl")
+        self.version_tag = f"v{CACHE_FORMAT_VERSION}-sdp{_parser_version()}"
+        self.directory = os.path.join(self.root, self.version_tag)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(ddl: str) -> str:
+        return hashlib.sha256(ddl.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pickle")
+
+    def get(self, ddl: str) -> Optional[List[Dict]]:
+        path = self._entry_path(self.key(ddl))
+        try:
+            with open(path, "rb") as f:
+                parsed = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated, corrupt or incompatible entry: a miss, and drop it so it is rewritten.
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        # Bump the mtime so eviction drops the least recently used entries first.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return parsed
+
+    def put(self, ddl: str, parsed: List[Dict]):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+            self._purge_stale_versions()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._entry_path(self.key(ddl)))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _purge_stale_versions(self):
+        for name in os.listdir(self.root):
+            if name != self.version_tag:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".pickle"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_ddl_cache: Optional[DDLCache] = None
+
+
+def get_ddl_cache() -> Optional[DDLCache]:
+    """Return the process-wide cache configured by ``PYVALIDATOR_CACHE_DIR``.
+
+    Setting ``PYVALIDATOR_NO_CACHE=1`` disables the cache.
+    """
+    global _ddl_cache
+    if os.environ.get("PYVALIDATOR_NO_CACHE"):
+        return None
+    cache_dir = os.environ.get("PYVALIDATOR_CACHE_DIR", DEFAULT_CACHE_DIR)
+    if _ddl_cache is None or _ddl_cache.root != os.path.join(cache_dir, "ddl"):
+        max_bytes = int(os.environ.get("PYVALIDATOR_DDL_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        _ddl_cache = DDLCache(cache_dir, max_bytes=max_bytes)
+    return _ddl_cache
@@ -0,0 +1,205 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from simple_ddl_parser import DDLParser
+
+from pyvalidator.ddl_cache import get_ddl_cache
+from pyvalidator.profiling import count, phase
+from pyvalidator.ddl_splitter import (batch_groups, group_table_statements, iter_file_statements, iter_statements,
+                                      iter_table_groups)
+
+
+# Statements handed to one DDLParser call; small enough to keep the parser fast, large enough to amortize its setup.
+PARSE_BATCH_STATEMENTS = 64
+
+
+def _run_parser(ddl: str) -> List[Dict]:
+    count("ddl.parser_calls")
+    with phase("ddl.parse"):
+        return DDLParser(ddl).run(output_mode="hql")
+
+
+def _parse(ddl: str) -> List[Dict]:
+    cache = get_ddl_cache()
+    if cache is None:
+        return _run_parser(ddl)
+
+    with phase("ddl.cache"):
+        parsed = cache.get(ddl)
+    if parsed is None:
+        parsed = _run_parser(ddl)
+        with phase("ddl.cache"):
+            cache.put(ddl, parsed)
+    return parsed
+
+
+def _parse_in_pool(batches: Iterator[str], workers: int) -> Iterator[Dict]:
+    # At most two batches per worker are in flight, so a long dump is never queued up whole.
+    window = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in batches:
+            window.append(executor.submit(_parse, batch))
+            if len(window) >= workers * 2:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def parse_groups(groups: Iterable[List[str]], workers: int = 1,
+                 batch_statements: int = PARSE_BATCH_STATEMENTS) -> Iterator[Dict]:
+    """Parse statement groups batch by batch, yielding each table as soon as its batch is parsed.
+
+    With ``workers > 1`` the batches go to a process pool and come back in order.
+    ``batch_statements=1`` parses every group on its own.
+    """
+    batches = batch_groups(groups, batch_statements)
+    if workers > 1:
+        head = list(islice(batches, 2))
+        batches = chain(head, batches)
+        if len(head) > 1:
+            yield from _parse_in_pool(batches, workers)
+            return
+    for batch in batches:
+        yield from _parse(batch)
+
+
+def parse_statements(statements: Iterable[str], workers: int = 1) -> Iterator[Dict]:
+    """Parse the table statements of a split DDL held in memory, batch by batch.
+
+    Each ``CREATE TABLE`` is parsed together with its ``ALTER TABLE ... FOREIGN
+    KEY`` statements.
+    """
+    return parse_groups(group_table_statements(statements), workers)
+
+
+def iter_ddl_tables(ddl: str, workers: int = 1, batch_statements: int = PARSE_BATCH_STATEMENTS) -> Iterator[Dict]:
+    """Yield the parsed tables of a DDL text one batch at a time."""
+    found = False
+    for table in parse_groups(iter_table_groups(lambda: iter_statements(ddl)), workers, batch_statements):
+        found = True
+        yield table
+    if not found and ddl.strip():
+        # Nothing looked like a CREATE TABLE; let the parser have the whole text as before.
+        yield from _parse(ddl)
+
+
+def iter_ddl_file_tables(ddl_path: str, workers: int = 1,
+                         batch_statements: int = PARSE_BATCH_STATEMENTS) -> Iterator[Dict]:
+    """Yield the parsed tables of a DDL file without loading it whole; only table statements reach the parser."""
+    found = False
+    for table in parse_groups(iter_table_groups(lambda: iter_file_statements(ddl_path)), workers, batch_statements):
+        found = True
+        yield table
+    if not found:
+        with open(ddl_path, 'r') as f:
+            yield from _parse(f.read())
+
+
+def parse_ddl_to_metadata(ddl:str, workers: int = 1):
+    return list(iter_ddl_tables(ddl, workers))
+
+
+def parse_ddl_file(ddl_path: str, workers: int = 1) -> List[Dict]:
+    return list(iter_ddl_file_tables(ddl_path, workers))
+
+
+class DDLTable():
+    """One ``CREATE TABLE`` from the parser output with its columns keyed by name."""
+
+    def __init__(self, table: Dict):
+        self.raw = table
+        self.name = table["table_name"]
+        self.schema = table.get("schema")
+        self.columns = {col["name"]: col for col in table.get("columns", [])}
+        self.primary_keys = list(table.get("primary_key") or [])
+        self.primary_key_set = frozenset(self.primary_keys)
+
+        self.references = {
+            col["name"]: col["references"]
+            for col in table.get("columns", [])
+            if col.get("references")
+        }
+        # ALTER TABLE ... FOREIGN KEY statements are folded into the table by the parser.
+        for col in (table.get("alter") or {}).get("columns", []):
+            if col.get("references"):
+                self.references.setdefault(col["name"], col["references"])
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.name}" if self.schema else self.name
+
+    def __repr__(self):
+        return f"DDLTable({self.name!r}, columns={len(self.columns)})"
+
+
+class DDLIndex():
+    """In-memory catalogue of every table in one or more DDL sources.
+
+    A warehouse dump is parsed once and each schema is then matched to its
+    table with a dictionary lookup on ``table_info[0].table``. Tables are keyed
+    by their schema-qualified name (``schema.table``), so same-named tables
+    in different schemas never replace each other; a bare name finds a table
+    only while it is unique across schemas.
+    """
+
+    def __init__(self, parsed_ddl: Optional[Iterable[Dict]] = None):
+        self.tables: Dict[str, DDLTable] = {}
+        self._by_name: Dict[str, List[DDLTable]] = {}
+        if parsed_ddl:
+            self.add(parsed_ddl)
+
+    @classmethod
+    def from_ddl(cls, ddl: str, workers: int = 1) -> "DDLIndex":
+        index = cls()
+        index.add(iter_ddl_tables(ddl, workers))
+        return index
+
+    @classmethod
+    def from_file(cls, ddl_path: str, workers: int = 1) -> "DDLIndex":
+        index = cls()
+        index.add(iter_ddl_file_tables(ddl_path, workers))
+        return index
+
+    def add(self, parsed_ddl: Iterable[Dict]):
+        for table_dict in parsed_ddl:
+            if "table_name" not in table_dict:
+                continue
+            table = DDLTable(table_dict)
+            key = table.qualified_name
+            same_name = self._by_name.setdefault(table.name, [])
+            if key in self.tables:
+                same_name.remove(self.tables[key])
+            self.tables[key] = table
+            same_name.append(table)
+
+    def get(self, table_name: str) -> Optional[DDLTable]:
+        table = self.tables.get(table_name)
+        if table is None:
+            same_name = self._by_name.get(table_name, ())
+            if len(same_name) == 1:
+                table = same_name[0]
+        return table
+
+    def ambiguous(self, table_name: str) -> List[str]:
+        """Qualified names sharing the bare ``table_name`` when more than one schema defines it."""
+        if table_name in self.tables:
+            return []
+        same_name = self._by_name.get(table_name, ())
+        return [table.qualified_name for table in same_name] if len(same_name) > 1 else []
+
+    def first(self) -> Optional[DDLTable]:
+        return next(iter(self.tables.values()), None)
+
+    def raw(self) -> List[Dict]:
+        return [table.raw for table in self.tables.values()]
+
+    def __contains__(self, table_name: str) -> bool:
+        return self.get(table_name) is not None
+
+    def __iter__(self) -> Iterator[DDLTable]:
+        return iter(self.tables.values())
+
+    def __len__(self) -> int:
+        return len(self.tables)
@@ -0,0 +1,219 @@
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Longest token the scanner has to see whole: ``--``, ``/*``, ``*/``, ``''`` or a ``$tag$``.
+_LOOKAHEAD = 64
+
+_NORMAL = re.compile(r"""[;'"`]|--|/\*|\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$""")
+_CLOSERS = {
+    "'": re.compile(r"'"),
+    '"': re.compile(r'"'),
+    "`": re.compile(r"`"),
+    "--": re.compile(r"\n"),
+    "/*": re.compile(r"\*/"),
+}
+_COPY_END = re.compile(r"^\\\.[ \t]*\r?$", re.M)
+
+_LEADING_COMMENTS = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.S)
+_CREATE_TABLE = re.compile(
+    r"CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?"
+    r"(?:(?:TEMP|TEMPORARY|TRANSIENT|VOLATILE|EXTERNAL|UNLOGGED)\s+)?"
+    r"TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>[^\s(]+)",
+    re.I,
+)
+_ALTER_TABLE = re.compile(r"ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?P<name>[^\s(]+)", re.I)
+_FOREIGN_KEY = re.compile(r"\bFOREIGN\s+KEY\b", re.I)
+_COPY_FROM_STDIN = re.compile(r"COPY\b.*\bFROM\s+STDIN\b", re.I | re.S)
+
+
+class StatementSplitter():
+    """Incremental splitter of SQL text into ``;``-terminated statements.
+
+    Text is fed in chunks of any size. Semicolons inside quoted strings and
+    identifiers, ``--`` and ``/* */`` comments and ``$tag$`` dollar-quoted
+    bodies do not end a statement, and the inline data of a pg_dump
+    ``COPY ... FROM stdin`` block is skipped.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._start = 0
+        self._pos = 0
+        self._closer = None
+        self._copy = False
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        self._buffer = self._buffer[self._start:] + chunk
+        self._pos -= self._start
+        self._start = 0
+        yield from self._scan(final=False)
+
+    def close(self) -> Iterator[str]:
+        yield from self._scan(final=True)
+        tail = self._buffer[self._start:]
+        self._buffer, self._start, self._pos = "", 0, 0
+        if tail.strip() and not self._copy:
+            yield tail
+
+    def _scan(self, final: bool) -> Iterator[str]:
+        buffer = self._buffer
+        limit = len(buffer) if final else len(buffer) - _LOOKAHEAD
+
+        while True:
+            if self._copy:
+                match = _COPY_END.search(buffer, self._pos)
+                if match is None or match.end() > limit:
+                    # COPY data is never part of a statement, so drop it up to the last complete line.
+                    newline = buffer.rfind("\n", self._start, max(self._pos, limit))
+                    if newline > self._start:
+                        self._start = self._pos = newline
+                    return
+                self._copy = False
+                self._start = self._pos = match.end()
+                continue
+
+            pattern = self._closer or _NORMAL
+            match = pattern.search(buffer, self._pos)
+            if match is None or match.end() > limit:
+                # Rescan the tail once more text arrives in case a token straddles the chunk boundary.
+                if not final and match is None:
+                    self._pos = max(self._pos, limit)
+                if final and match is None:
+                    self._pos = len(buffer)
+                return
+
+            token = match.group()
+            self._pos = match.end()
+            if self._closer is not None:
+                # A doubled quote is an escaped quote, not the end of the string.
+                if token in ("'", '"', "`") and buffer.startswith(token, self._pos):
+                    self._pos += 1
+                    continue
+                self._closer = None
+            elif token == ";":
+                statement = buffer[self._start:self._pos]
+                self._start = self._pos
+                if _COPY_FROM_STDIN.match(strip_leading_comments(statement)):
+                    self._copy = True
+                yield statement
+            elif token in _CLOSERS:
+                self._closer = _CLOSERS[token]
+            else:
+                self._closer = re.compile(re.escape(token))
+
+
+def strip_leading_comments(statement: str) -> str:
+    return statement[_LEADING_COMMENTS.match(statement).end():]
+
+
+def iter_statements(source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Split DDL text, an open text file or an iterable of chunks into statements."""
+    if isinstance(source, str):
+        chunks: Iterable[str] = (source,)
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), "")
+    else:
+        chunks = source
+
+    splitter = StatementSplitter()
+    for chunk in chunks:
+        for statement in splitter.feed(chunk):
+            statement = strip_leading_comments(statement).strip()
+            if statement and statement != ";":
+                yield statement
+    for statement in splitter.close():
+        statement = strip_leading_comments(statement).strip()
+        if statement and statement != ";":
+            yield statement
+
+
+def iter_file_statements(ddl_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    with open(ddl_path, 'r', encoding="utf-8", errors="replace") as f:
+        yield from iter_statements(f, chunk_size)
+
+
+def _table_key(name: str) -> str:
+    return re.sub(r'["`\[\]]', "", name).lower()
+
+
+def table_statements(statements: Iterable[str]) -> Iterator[str]:
+    """Keep only ``CREATE TABLE`` and ``ALTER TABLE ... FOREIGN KEY`` statements."""
+    for statement in statements:
+        if _CREATE_TABLE.match(statement):
+            yield statement
+        elif _ALTER_TABLE.match(statement) and _FOREIGN_KEY.search(statement):
+            yield statement
+
+
+def _assign_alters(statements: Iterable[str]) -> Tuple[Dict[int, List[str]], List[str]]:
+    """Match every ``ALTER TABLE`` to the position of the ``CREATE TABLE`` it targets.
+
+    An alter belongs to the latest earlier ``CREATE`` of the same name, else
+    to the first earlier one with the same unqualified name. Only the alter
+    statements are kept.
+    """
+    attached: Dict[int, List[str]] = {}
+    orphans: List[str] = []
+    by_name: Dict[str, int] = {}
+    by_short_name: Dict[str, int] = {}
+    creates = 0
+
+    for statement in table_statements(statements):
+        create = _CREATE_TABLE.match(statement)
+        if create:
+            key = _table_key(create.group("name"))
+            by_name[key] = creates
+            by_short_name.setdefault(key.rsplit(".", 1)[-1], creates)
+            creates += 1
+            continue
+
+        key = _table_key(_ALTER_TABLE.match(statement).group("name"))
+        position = by_name.get(key)
+        if position is None:
+            position = by_short_name.get(key.rsplit(".", 1)[-1])
+        if position is None:
+            orphans.append(statement)
+        else:
+            attached.setdefault(position, []).append(statement)
+    return attached, orphans
+
+
+def iter_table_groups(open_statements: Callable[[], Iterable[str]]) -> Iterator[List[str]]:
+    """Yield each ``CREATE TABLE`` with the ``ALTER TABLE`` statements that target it, one group at a time.
+
+    The parser folds foreign keys declared by ``ALTER TABLE`` into the table
+    only when both statements are parsed together, and dumps usually put
+    those alters at the very end. ``open_statements`` is therefore called
+    twice: a first pass keeps only the alters, the second streams the
+    ``CREATE`` statements. Groups keep the order of the ``CREATE``
+    statements; alters for unknown tables form a last group of their own.
+    """
+    attached, orphans = _assign_alters(open_statements())
+    position = 0
+    for statement in table_statements(open_statements()):
+        if _CREATE_TABLE.match(statement):
+            yield [statement] + attached.get(position, [])
+            position += 1
+    if orphans:
+        yield orphans
+
+
+def group_table_statements(statements: Iterable[str]) -> List[List[str]]:
+    """List form of ``iter_table_groups`` for statements already in memory."""
+    statements = list(statements)
+    return list(iter_table_groups(lambda: statements))
+
+
+def batch_groups(groups: Iterable[List[str]], max_statements: int) -> Iterator[str]:
+    """Join statement groups into parser inputs of about ``max_statements`` statements."""
+    batch: List[str] = []
+    for group in groups:
+        if batch and len(batch) + len(group) > max_statements:
+            yield "\n".join(batch)
+            batch = []
+        batch.extend(group)
+    if batch:
+        yield "\n".join(batch)
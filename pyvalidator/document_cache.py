@@ -0,0 +1,239 @@
+import contextlib
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from pyvalidator.profiling import count, phase
+from ruamel.yaml import YAML
+from ruamel.yaml.comments import CommentedMap
+from ruamel.yaml.scalarstring import ScalarString
+
+if TYPE_CHECKING:
+    from pyvalidator.document_source import DocumentSource
+
+
+class LocationIndex():
+    """Flat map from key path (tuple) to the zero-based (line, column) of that key.
+
+    Built in a single walk over the document the first time a location is
+    requested, after which every lookup is a dict access. Sequence items are
+    indexed by their position, mapping entries by the position of the key.
+    """
+
+    def __init__(self, document: Any):
+        self._document = document
+        self._index: Optional[Dict[Tuple, Tuple[int, int]]] = None
+        self._values: Dict[Tuple, Tuple[int, int]] = {}
+
+    def _build(self) -> Dict[Tuple, Tuple[int, int]]:
+        index = {}
+        pending = [((), self._document)]
+        while pending:
+            path, node = pending.pop()
+            if isinstance(node, dict):
+                children = node.items()
+            elif isinstance(node, list):
+                children = enumerate(node)
+            else:
+                continue
+            positions = getattr(getattr(node, "lc", None), "data", None) or {}
+            for key, value in children:
+                child_path = path + (key,)
+                position = positions.get(key)
+                if position is not None:
+                    index[child_path] = (position[0], position[1])
+                    # Mapping entries also record where their value starts; sequence items are their value.
+                    self._values[child_path] = (position[-2], position[-1])
+                if isinstance(value, (dict, list)):
+                    pending.append((child_path, value))
+        return index
+
+    def get(self, path: Tuple) -> Optional[Tuple[int, int]]:
+        if self._index is None:
+            self._index = self._build()
+        try:
+            return self._index.get(tuple(path))
+        except TypeError:
+            # Unhashable path component; it cannot be a key in the document.
+            return None
+
+    def value(self, path: Tuple) -> Optional[Tuple[int, int]]:
+        """Zero-based (line, column) where the value at ``path`` starts."""
+        if self._index is None:
+            self._index = self._build()
+        try:
+            return self._values.get(tuple(path))
+        except TypeError:
+            return None
+
+    def line(self, path: Tuple) -> Optional[int]:
+        """One-based line number of ``path``, or ``None`` when it is not in the document."""
+        position = self.get(path)
+        return position[0] + 1 if position is not None else None
+
+    @property
+    def built(self) -> bool:
+        return self._index is not None
+
+    @property
+    def has_lines(self) -> bool:
+        """Whether the document was parsed from YAML text; plain mappings carry no positions."""
+        return hasattr(self._document, "lc")
+
+
+class DocumentCache():
+    """Keeps one parsed ruamel document per file for the duration of a run.
+
+    Entries are keyed by path and invalidated when the file's mtime or size
+    changes, so the format, DDL and error-location passes all share a single
+    parse (including the ``lc`` line/column data) of each YAML file.
+
+    Inside ``virtual(...)`` the given paths are served from in-memory
+    document sources instead of the file system, for the current thread only.
+    """
+
+    def __init__(self):
+        self._documents: Dict[str, Tuple[Tuple[int, int], CommentedMap]] = {}
+        self._locations: Dict[str, LocationIndex] = {}
+        self._overlay = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    @contextlib.contextmanager
+    def virtual(self, documents: Dict[str, "DocumentSource"]):
+        """Serve ``documents`` (path -> in-memory ``DocumentSource``) in place of the files at those paths.
+
+        Nothing is written to disk and the file cache is left untouched, so
+        other threads keep seeing the files.
+        """
+        previous = getattr(self._overlay, "documents", None)
+        current = dict(previous or {})
+        for path, source in documents.items():
+            current[os.path.abspath(path)] = source
+        self._overlay.documents = current
+        try:
+            yield
+        finally:
+            self._overlay.documents = previous
+
+    def _virtual(self, key: str):
+        documents = getattr(self._overlay, "documents", None)
+        return documents.get(key) if documents else None
+
+    def overlay(self, path: str) -> Optional["DocumentSource"]:
+        """The in-memory source served for ``path`` by an active ``virtual(...)``, else ``None``."""
+        return self._virtual(os.path.abspath(path))
+
+    @staticmethod
+    def _fingerprint(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self, path: str) -> CommentedMap:
+        key = os.path.abspath(path)
+        virtual = self._virtual(key)
+        if virtual is not None:
+            return virtual.load()
+        fingerprint = self._fingerprint(key)
+
+        cached = self._documents.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        count("yaml.documents")
+        with phase("yaml.load"):
+            yaml = YAML()
+            with open(key, 'r') as file:
+                document = yaml.load(file)
+
+        self._documents[key] = (fingerprint, document)
+        self._locations.pop(key, None)
+        return document
+
+    def locations(self, path: str) -> LocationIndex:
+        """Location index of the current document at ``path``, created lazily."""
+        key = os.path.abspath(path)
+        virtual = self._virtual(key)
+        if virtual is not None:
+            return virtual.locations()
+        document = self.load(path)
+        index = self._locations.get(key)
+        if index is None or index._document is not document:
+            index = self._locations[key] = LocationIndex(document)
+        return index
+
+    def peek(self, path: str) -> Optional[CommentedMap]:
+        """Return the cached document for ``path`` if it is still fresh, without parsing."""
+        key = os.path.abspath(path)
+        virtual = self._virtual(key)
+        if virtual is not None:
+            return virtual.load()
+        cached = self._documents.get(key)
+        if cached is None:
+            return None
+        try:
+            fingerprint = self._fingerprint(key)
+        except OSError:
+            return None
+        if cached[0] != fingerprint:
+            return None
+        self.hits += 1
+        return cached[1]
+
+    def invalidate(self, path: str = None):
+        if path is None:
+            self._documents.clear()
+            self._locations.clear()
+        else:
+            self._documents.pop(os.path.abspath(path), None)
+            self._locations.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "documents": len(self._documents)}
+
+
+document_cache = DocumentCache()
+
+
+def load_yaml(path: str) -> CommentedMap:
+    return document_cache.load(path)
+
+
+def to_plain(node: Any) -> Any:
+    """Convert a ruamel round-trip document into plain dicts, lists and scalars."""
+    if isinstance(node, dict):
+        return {to_plain(key): to_plain(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [to_plain(item) for item in node]
+    if isinstance(node, ScalarString):
+        return str(node)
+    if isinstance(node, bool) or node is None:
+        return node
+    # ScalarInt / ScalarFloat keep their formatting attributes; drop them.
+    if isinstance(node, int):
+        return int(node)
+    if isinstance(node, float):
+        return float(node)
+    return node
+
+
+def safe_load(stream) -> Any:
+    """Parse YAML into plain containers with the same (1.2) scalar rules as the round-trip loader."""
+    return YAML(typ="safe", pure=True).load(stream)
+
+
+def load_plain_yaml(path: str) -> Any:
+    """Load a YAML file as plain Python containers, parsing it at most once.
+
+    Reuses the round-trip document when another pass already parsed the file;
+    otherwise parses with ruamel's safe loader, since callers of this
+    function do not need line numbers. Both follow YAML 1.2, so keys like
+    ``on``/``no`` load the same way whether or not the file was cached.
+    """
+    document = document_cache.peek(path)
+    if document is not None:
+        return to_plain(document)
+    with open(path, 'r') as file:
+        return safe_load(file)
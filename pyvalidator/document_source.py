@@ -0,0 +1,119 @@
+import linecache
+import os
+from typing import Any, Mapping, Optional, Union
+
+from pydantic import BaseModel
+from ruamel.yaml import YAML
+
+from pyvalidator.document_cache import LocationIndex, document_cache, load_plain_yaml, to_plain
+from pyvalidator.profiling import count, phase
+
+
+class DocumentSource():
+    """One YAML document for a validator: a file, YAML text, or an already parsed mapping.
+
+    File sources go through the shared ``document_cache``. In-memory sources
+    are parsed at most once, by the source itself, and never touch the file
+    system. ``path`` is the file reported in messages and issues; in-memory
+    sources may set it to where the document lives or will be written.
+    """
+
+    def __init__(self, path: Optional[str] = None, text: Optional[str] = None, data: Any = None):
+        self.path = path
+        self._text = text
+        self._data = data
+        self._locations: Optional[LocationIndex] = None
+
+    @classmethod
+    def from_path(cls, path: Union[str, os.PathLike]) -> "DocumentSource":
+        return cls(path=os.fspath(path))
+
+    @classmethod
+    def from_text(cls, text: Union[str, bytes], path: Optional[str] = None) -> "DocumentSource":
+        """YAML (or JSON) text. Parsed with line information, so errors still report line numbers."""
+        if isinstance(text, (bytes, bytearray)):
+            text = bytes(text).decode("utf-8")
+        return cls(path=path, text=text)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping, path: Optional[str] = None) -> "DocumentSource":
+        """An already parsed ``{name: body}`` document, used as is. Its errors have no line numbers."""
+        return cls(path=path, data=data)
+
+    @classmethod
+    def from_model(cls, model: BaseModel, name: Optional[str] = None, path: Optional[str] = None) -> "DocumentSource":
+        """``{name: model}`` as it would be written to disk; a ``GeneratedSchema`` defaults to its table name."""
+        if name is None:
+            name = model.table_info[0].table
+        return cls.from_mapping({name: model.model_dump()}, path)
+
+    @property
+    def in_memory(self) -> bool:
+        return self._text is not None or self._data is not None
+
+    @property
+    def name(self) -> Optional[str]:
+        """Registry name of the document: the file name without extension, else its top-level key."""
+        if self.path:
+            return os.path.splitext(os.path.basename(self.path))[0]
+        document = self.load()
+        if isinstance(document, Mapping) and document:
+            return str(next(iter(document)))
+        return None
+
+    def load(self) -> Any:
+        if self._data is None:
+            if self._text is None:
+                return document_cache.load(self.path)
+            count("yaml.documents")
+            with phase("yaml.load"):
+                self._data = YAML().load(self._text)
+        return self._data
+
+    def load_plain(self) -> Any:
+        """The document as plain dicts, lists and scalars."""
+        if not self.in_memory:
+            return load_plain_yaml(self.path)
+        return to_plain(self.load())
+
+    def locations(self) -> LocationIndex:
+        if not self.in_memory:
+            return document_cache.locations(self.path)
+        if self._locations is None:
+            self._locations = LocationIndex(self.load())
+        return self._locations
+
+    def line_text(self, number: int) -> Optional[str]:
+        """Text of the one-based line ``number``, or ``None`` for mapping sources."""
+        if self._text is not None:
+            lines = self._text.splitlines()
+            return lines[number - 1] if 0 < number <= len(lines) else None
+        if self.in_memory:
+            return None
+        virtual = document_cache.overlay(self.path)
+        if virtual is not None:
+            return virtual.line_text(number)
+        linecache.checkcache(self.path)
+        return linecache.getline(self.path, number) or None
+
+    def __repr__(self):
+        origin = "memory" if self.in_memory else "file"
+        return f"DocumentSource({self.path!r}, {origin})"
+
+
+DocumentInput = Union[DocumentSource, str, os.PathLike, bytes, Mapping, BaseModel]
+
+
+def as_source(source: DocumentInput) -> DocumentSource:
+    """Wrap whatever a validator was given. A ``str`` is a path; wrap YAML text with ``from_text``."""
+    if isinstance(source, DocumentSource):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        return DocumentSource.from_path(source)
+    if isinstance(source, (bytes, bytearray)):
+        return DocumentSource.from_text(source)
+    if isinstance(source, BaseModel):
+        return DocumentSource.from_model(source)
+    if isinstance(source, Mapping):
+        return DocumentSource.from_mapping(source)
+    raise TypeError(f"Cannot validate a {type(source).__name__}; expected a path, text, mapping or DocumentSource")
@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+
+REFERENCE_PATTERN = re.compile(r'\[([^\[\]]+)\]')
+
+SECTIONS = ("attributes", "metrics")
+
+
+class Token(NamedTuple):
+    """A ``[name]`` reference; ``start``/``end`` span the brackets in the expression."""
+    name: str
+    start: int
+    end: int
+
+
+class Reference(NamedTuple):
+    """One identifier referenced from a calculation, filter or include list."""
+    section: str
+    key: str
+    context: str
+    name: str
+    span: Optional[Tuple[int, int]]
+    expression: Optional[str]
+
+
+class ExpressionTokenizer():
+    """Bracket-reference tokenizer with an LRU memo keyed by expression string.
+
+    The same calculations and filters recur across a registry (``[team_id]``,
+    ``[game_id]``), so repeated expressions are tokenized once.
+    """
+
+    def __init__(self, maxsize: int = 8192):
+        self.tokenize = lru_cache(maxsize=maxsize)(self._tokenize)
+
+    @staticmethod
+    def _tokenize(expression: str) -> Tuple[Token, ...]:
+        return tuple(
+            Token(match.group(1), match.start(), match.end())
+            for match in REFERENCE_PATTERN.finditer(expression)
+        )
+
+    def references(self, expression: str) -> List[str]:
+        return [token.name for token in self.tokenize(expression)]
+
+    def cache_info(self):
+        return self.tokenize.cache_info()
+
+    def cache_clear(self):
+        self.tokenize.cache_clear()
+
+
+tokenizer = ExpressionTokenizer()
+
+
+def tokenize(expression: str) -> Tuple[Token, ...]:
+    return tokenizer.tokenize(expression)
+
+
+def extract_references(expression: str) -> List[str]:
+    return tokenizer.references(expression)
+
+
+def iter_references(generated_semantics: Mapping, sections=SECTIONS) -> Iterator[Reference]:
+    """Yield every reference in a semantics body, key by key.
+
+    For each item the order is include, calculation, then filter, which is
+    the order the validator reports them in.
+    """
+    for section in sections:
+        for key, values in (generated_semantics.get(section) or {}).items():
+            if values.get("include"):
+                for name in values["include"]:
+                    yield Reference(section, key, "include", name, None, None)
+
+            if values.get("calculation"):
+                expression = values["calculation"]
+                for token in tokenizer.tokenize(expression):
+                    yield Reference(section, key, "calculation", token.name, (token.start, token.end), expression)
+
+            if values.get("filter"):
+                for expression in values["filter"]:
+                    for token in tokenizer.tokenize(expression):
+                        yield Reference(section, key, "filter", token.name, (token.start, token.end), expression)
+
+
+def extract_registry_references(documents: Mapping[str, Mapping]) -> Dict[str, List[Reference]]:
+    """Extract the references of many semantics bodies in one batched pass."""
+    return {name: list(iter_references(document)) for name, document in documents.items()}
@@ -1,16 +1,16 @@
 import re
-from pydantic import BaseModel, field_validator, model_validator, ValidationError, Field
-from typing import List, Dict, Optional, Generic, TypeVar, Type            
-import sys
-import yaml    
-
-
-import logging
-from ruamel.yaml import YAML
+from pydantic import BaseModel, field_validator, model_validator, ValidationError, Field, TypeAdapter
+from pydantic_core import from_json
+from typing import Iterable, List, Dict, Optional, Generic, TypeVar, Union
 from ruamel.yaml.constructor import DuplicateKeyError 
-from ruamel.yaml.comments import CommentedMap
 
 from pyvalidator.helpers import decipher_error_messages, print_decorated_section
+from pyvalidator.document_source import DocumentInput, as_source
+from pyvalidator.profiling import profiled
+
+
+JOIN_CONDITION_PATTERN = re.compile(r'^[\w]+\.[\w]+\s*=\s*[\w]+\.[\w]+$')
+COLUMN_NAME_PATTERN = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*$')
 
 
 class Join(BaseModel):
@@ -22,8 +22,7 @@ class Join(BaseModel):
         if self.join:
             if not self.on:
                 raise ValueError(f'Join condition empty for join {self.join}')
-            pattern = r'^[\w]+\.[\w]+\s*=\s*[\w]+\.[\w]+$'
-            if not isinstance(self.on, str) or not re.match(pattern, self.on):
+            if not isinstance(self.on, str) or not JOIN_CONDITION_PATTERN.match(self.on):
                 raise ValueError(
                     f'Invalid join condition format: "{self.on}". Expected format: "table.column = table.column"'
                 )
@@ -64,45 +63,22 @@ class GeneratedSchema(BaseModel):
     
     
     @model_validator(mode="after")
-    def _check_unique_column_id(self):
-        columns = list(self.columns.keys())
-        column_ids = set()
-        for column_id in columns:
-            if column_id not in column_ids:
-                column_ids.add(column_id)
-            else:
-                raise ValueError("Columns ids not unique")
-        return self   
-    
-    @model_validator( mode="after")
-    def _check_column_name_format(self):
-        columns = self.columns
-        # columns = values.get("columns",{})
-        pattern = r'[a-zA-Z_][a-zA-Z0-9_]*$'
-        for column_id, column in columns.items():
-            if not re.match(pattern, column_id):
-                raise ValueError(f"Column name: {column_id} not matching with the column name format")  
+    def _check_columns(self):
+        """Column name format and table references, checked in one pass over the columns.
+
+        A malformed column name is reported before any missing table reference,
+        whichever column comes first. Column ids are dict keys, so they are unique.
+        """
+        tables_set = {table.table for table in self.table_info}
+        reference_error = None
+        for column_id, column in self.columns.items():
+            if not COLUMN_NAME_PATTERN.match(column_id):
+                raise ValueError(f"Column name: {column_id} not matching with the column name format")
+            if reference_error is None and column.table is not None and column.table not in tables_set:
+                reference_error = f"{column.table} reference missing"
+        if reference_error is not None:
+            raise ValueError(reference_error)
         return self
-        
-    @model_validator(mode="after")
-    def _validate_table_reference(self):
-        tables_set = set()
-        tables = self.table_info
-        for table in tables:
-            tables_set.add(table.table)
-        
-        columns = self.columns
-        for column_id, column in columns.items():
-            if column.table != None:
-                if type(column.table) == str:
-                    reference = column.table
-                    if reference not in tables_set:
-                        raise ValueError(f"{column['table']} reference missing")
-                elif type(column.table) == list:
-                    for reference in column['table']:
-                        if reference not in tables_set:
-                            raise ValueError(f"{column['table']} reference missing")
-        return self 
     
 
 GeneratedSchemaType = TypeVar('GeneratedSchemaType', bound=GeneratedSchema)
@@ -168,36 +144,110 @@ class SemanticWrapper(BaseModel, Generic[GeneratedSemanticsType]):
     
 
 
-def schema_main(schema_path):
+# Built once: validating through a prebuilt adapter goes straight to pydantic-core.
+SCHEMA_ADAPTER = TypeAdapter(GeneratedSchema)
+SEMANTICS_ADAPTER = TypeAdapter(GeneratedSemantics)
+
+_ADAPTERS = {"schema": SCHEMA_ADAPTER, "semantics": SEMANTICS_ADAPTER}
+_DOCUMENT_ADAPTERS = {
+    "schema": TypeAdapter(Dict[str, GeneratedSchema]),
+    "semantics": TypeAdapter(Dict[str, GeneratedSemantics]),
+}
+_TOP_LEVEL_ERRORS = {
+    "schema": "Schema should have only one key at the top level",
+    "semantics": "Semantics should have only one key at the top level",
+}
+_EMPTY_ERRORS = {
+    "schema": "Schema document is empty",
+    "semantics": "Semantics document is empty",
+}
+
+
+def _error_dicts(error: ValidationError, skip: int = 0) -> List[Dict]:
+    return [{"loc": e["loc"][skip:], "msg": e["msg"], "type": e["type"]} for e in error.errors()]
+
+
+def _top_level_error(kind: str) -> List[Dict]:
+    return [{"loc": ["root"], "msg": _TOP_LEVEL_ERRORS[kind], "type": "top_level_key_error"}]
+
+
+def _empty_error(kind: str) -> List[Dict]:
+    return [{"loc": ["root"], "msg": _EMPTY_ERRORS[kind], "type": "empty_document"}]
+
+
+def root_errors(kind: str, document) -> Optional[List[Dict]]:
+    """Errors of a document that is not a single-key ``{name: body}`` mapping, else ``None``."""
+    if not document:
+        return _empty_error(kind)
+    if not isinstance(document, dict) or len(document) > 1:
+        return _top_level_error(kind)
+    return None
+
+
+@profiled("format.pydantic")
+def validate_body(kind: str, body) -> Optional[List[Dict]]:
+    """Format errors of one schema or semantics body (the mapping under the top-level key)."""
+    try:
+        _ADAPTERS[kind].validate_python(body)
+    except ValidationError as error:
+        return _error_dicts(error)
+    return None
+
+
+def validate_document(kind: str, document: Union[Dict, str, bytes]) -> Optional[List[Dict]]:
+    """Format errors of a whole ``{name: body}`` document given as a mapping or as JSON text/bytes.
+
+    Errors have the same ``loc``/``msg``/``type`` shape, relative to the body,
+    as ``schema_main`` and ``semantic_main`` return for a file.
+    """
+    if isinstance(document, (str, bytes, bytearray)):
+        try:
+            _DOCUMENT_ADAPTERS[kind].validate_json(document)
+        except ValidationError as error:
+            parsed = from_json(document) if error.errors()[0]["type"] != "json_invalid" else None
+            if isinstance(parsed, dict) and len(parsed) > 1:
+                return _top_level_error(kind)
+            if isinstance(parsed, dict):
+                return _error_dicts(error, skip=1)
+            return _error_dicts(error)
+        document = from_json(document)
+        if not document:
+            return _empty_error(kind)
+        if len(document) > 1:
+            return _top_level_error(kind)
+        return None
+
+    errors = root_errors(kind, document)
+    if errors:
+        return errors
+    return validate_body(kind, next(iter(document.values())))
+
+
+def validate_documents(kind: str, documents: Iterable[Union[Dict, str, bytes]]) -> List[Optional[List[Dict]]]:
+    """``validate_document`` for each document in turn: one result per document, in order."""
+    return [validate_document(kind, document) for document in documents]
+
+
+def schema_main(schema_path: DocumentInput):
     
     print_decorated_section(title="Validating Schema Format")
     
-    yaml = YAML()
-    
-    with open(schema_path, 'r') as file:
-        try:
-            yaml_file = yaml.load(file)
-        except DuplicateKeyError as e:
-            print_decorated_section(title="Duplicate Key found", content=[f"Duplicate Key found: {e}"])
+    try:
+        yaml_file = as_source(schema_path).load()
+    except DuplicateKeyError as e:
+        print_decorated_section(title="Duplicate Key found", content=[f"Duplicate Key found: {e}"])
             
     
-    # Extract key from the yaml file    
-    keys = list(yaml_file.keys())
-    yaml_file = yaml_file[keys[0]]
-    
-    # wrapping schema into the schema wrapper
-    if len(keys) > 1:
-        error = [{"loc": ["root"], "msg": "Schema should have only one key at the top level", "type": "top_level_key_error"}]
-        return error
-    else:
-        try:
-            schema = GeneratedSchema(**yaml_file)
-        except ValidationError as error:
-            error = [{"loc": e["loc"], "msg": e["msg"], "type": e["type"]} for e in error.errors()]
-            return error
+    errors = root_errors("schema", yaml_file)
+    if errors:
+        return errors
+    # Validate the body under the single top-level key
+    return validate_body("schema", next(iter(yaml_file.values())))
     
     
-def validate_schema_format(schema_path:str):
+def validate_schema_format(schema_path: DocumentInput):
+    # Wrapped once so an in-memory document is parsed once for both passes.
+    schema_path = as_source(schema_path)
     output = schema_main(schema_path=schema_path)
     if output is not None:
         errors = decipher_error_messages(yaml_path=schema_path, errors=output)
@@ -208,36 +258,26 @@ def validate_schema_format(schema_path:str):
         print_decorated_section(title="Format Validation Passed")
     
 
-def semantic_main(semantic_path):
-    yaml = YAML()
-
+def semantic_main(semantic_path: DocumentInput):
     print_decorated_section(title="Validating Formats in Semantics")
     # semantic_path = "assets/semantics/movies.yml"
     
 
-    with open(semantic_path, 'r') as file:
-        try:
-            yaml_file = yaml.load(file)
-        except DuplicateKeyError as e:
-            print_decorated_section(title="Duplicate Key found", content=[f"Duplicate Key found: {e}"])
+    try:
+        yaml_file = as_source(semantic_path).load()
+    except DuplicateKeyError as e:
+        print_decorated_section(title="Duplicate Key found", content=[f"Duplicate Key found: {e}"])
         
         
     
-    keys = list(yaml_file.keys())
-    yaml_file = yaml_file[keys[0]]
-    
-    if len(keys) > 1:
-        error = [{"loc": ["root"], "msg": "Semantics should have only one key at the top level", "type": "top_level_key_error"}]
-        return error
-    else:
-        try:
-            semantic = GeneratedSemantics(**yaml_file)
-        except ValidationError as error:
-            error = [{"loc": e["loc"], "msg": e["msg"], "type": e["type"]} for e in error.errors()]
-            return error
+    errors = root_errors("semantics", yaml_file)
+    if errors:
+        return errors
+    return validate_body("semantics", next(iter(yaml_file.values())))
     
     
-def validate_semantic_format(semantic_path:str):
+def validate_semantic_format(semantic_path: DocumentInput):
+    semantic_path = as_source(semantic_path)
     output = semantic_main(semantic_path=semantic_path)
     if output is not None:
         errors = decipher_error_messages(yaml_path=semantic_path, errors=output)
@@ -1,8 +1,11 @@
-from ruamel.yaml import YAML
-from typing import List, Dict
+from typing import List, Dict, Optional, TextIO, Tuple
+import os
+import sys
 import types
 import re
-from ruamel.yaml.comments import CommentedMap
+from pyvalidator.document_source import DocumentInput, as_source
+from pyvalidator.profiling import count, profiled
+from pyvalidator.results import ValidationIssue, record_issues
 
 
 # def get_line_number(node):
@@ -15,180 +18,162 @@ from ruamel.yaml.comments import CommentedMap
 
 
 
-def decipher_error_messages(yaml_path :str,errors: List[Dict[str, str]]) -> List[str]:
-    
-    
-    def get_top_level_line(key):
-        line_num = 1  # fallback
-        if hasattr(yaml_file, "lc") and isinstance(yaml_file, CommentedMap):
-            try:
-                line_num = yaml_file.lc.data.get(key, [0])[0] + 1
-            except Exception:
-                pass
-        return line_num
-    
-    
-    yaml = YAML()
-    with open(yaml_path, 'r') as file:
-        yaml_file = yaml.load(file)
-    
-    error_messages = []
-    for error in errors:
-        loc = error.get("loc", [])
+TYPE_ERROR_PATTERN = re.compile(r"^[\w]*_type")
+
+
+def _normalize_loc(loc) -> List:
+    # Fix for 'types.GenericAlias' and other strange types
+    if isinstance(loc, (type, types.GenericAlias)):
+        return []
 
-        # Fix for 'types.GenericAlias' and other strange types
-        if isinstance(loc, (type, types.GenericAlias)):
-            loc = []
+    # Defensive normalization
+    if isinstance(loc, str):
+        return [loc]
+    if not isinstance(loc, (list, tuple)):
+        try:
+            return list(loc)
+        except Exception:
+            return []
+    return list(loc)
 
-        # Defensive normalization
-        if isinstance(loc, str):
-            loc = [loc]
-        elif not isinstance(loc, (list, tuple)):
-            try:
-                loc = list(loc)
-            except Exception:
-                loc = []
 
+def _token_position(source, locations, root: Tuple, span: Dict, token: str) -> Tuple[Optional[int], Optional[int]]:
+    """One-based line and column of ``token`` at ``span`` in the expression at ``span["loc"]``.
+
+    Found only when the expression is a scalar on a single line; block
+    scalars and mapping sources give ``(None, None)``.
+    """
+    position = locations.value(root + tuple(span["loc"]))
+    if position is None:
+        return None, None
+    line, column = position
+    text = source.line_text(line + 1)
+    if text is None:
+        return None, None
+    # Plain scalars start at the value column, quoted ones one character later.
+    for start in (column + span["start"], column + 1 + span["start"]):
+        if text[start:start + len(token)] == token:
+            return line + 1, start + 1
+    return None, None
+
+
+@profiled("decipher")
+def decipher_issues(yaml_path: DocumentInput, errors: List[Dict[str, str]]) -> List[ValidationIssue]:
+    """Resolve the line of each ``{"loc", "type", "msg"}`` error and word its message.
+
+    ``yaml_path`` is a path or any other document source (see ``as_source``).
+    """
+    source = as_source(yaml_path)
+    yaml_file = source.load()
+    # Built on the first lookup and kept with the cached document.
+    locations = source.locations()
+
+    # Error locations are relative to the single top-level key of the file.
+    root = (list(yaml_file.keys())[0],) if isinstance(yaml_file, dict) and yaml_file else ()
+    
+    count("decipher.errors", len(errors))
+    issues = []
+    for error in errors:
+        loc = _normalize_loc(error.get("loc", []))
         msg = error.get("msg", "")
         _type = error.get("type", "")
+        is_type_error = TYPE_ERROR_PATTERN.match(_type) is not None
+
+        # Expression references carry the span of their token; point at it when it can be found.
+        token_line = column = end_column = None
+        span = error.get("span")
+        if span is not None and loc:
+            token = f"[{loc[-1]}]"
+            token_line, column = _token_position(source, locations, root, span, token)
+            if column is not None:
+                end_column = column + len(token) - 1
+
+        if len(loc) == 1:
+            key = loc[0]
+            line_number = locations.line((key,)) or (1 if locations.has_lines else None)
+            where = f"at or near line {line_number}" if line_number is not None else "at unknown line"
+            if _type == "missing":
+                message = f"Missing top-level element '{key}' {where}"
+            elif is_type_error:
+                message = f"Invalid type for top-level '{key}' {where}: {msg}"
+            else:
+                message = f"{msg} {where}"
 
-        if _type == "missing":
-            if len(loc) == 1:
-                missing_key = loc[0]
-                line_number = get_top_level_line(missing_key)
-                error_messages.append(
-                        f"Missing top-level element '{missing_key}' at or near line {line_number}"
-                    )
-                continue
-
-            # else follow original deeper logic
-            node = yaml_file
-            keys = list(node.keys())
-            node = node[keys[0]]
-
-            parents = []
-            for key in loc[:-1]:
-                if not isinstance(node, dict):
-                    node = None
+        elif _type == "missing":
+            # Report the deepest mapping ancestor of the missing key that exists.
+            line_number = None
+            for depth in range(len(loc) - 1):
+                if depth > 0 and isinstance(loc[depth], int):
                     break
-                parents.append((node, key))
-                node = node.get(key)
+                line_number = locations.line(root + tuple(loc[:depth + 1])) or line_number
 
-            line_number = None
-            for parent, key in reversed(parents):
-                if hasattr(parent, "lc") and isinstance(parent, CommentedMap):
-                    try:
-                        line_number = parent.lc.data[key][0] + 1
-                        break
-                    except (KeyError, IndexError, TypeError):
-                        continue
-
-            missing_element = loc[-1]
+            missing_element = loc[-1] if loc else None
             parent_element = loc[-2] if len(loc) > 1 else None
-
             if line_number is not None:
-                error_messages.append(
-                        f"Missing element '{missing_element}' in '{parent_element}' at line {line_number}"
-                    )
+                message = f"Missing element '{missing_element}' in '{parent_element}' at line {line_number}"
             else:
-                error_messages.append(
-                        f"Missing element '{missing_element}' in '{parent_element}' (line unknown)"
-                    )
-
-        elif re.match(r"^[\w]*_type", _type):
-            if len(loc) == 1:
-                key = loc[0]
-                line_number = get_top_level_line(key)
-                error_messages.append(
-                        f"Invalid type for top-level '{key}' at or near line {line_number}: {msg}"
-                    )
-                continue
-
-            node = yaml_file
-            keys = list(node.keys())
-            node = node[keys[0]]
-
-            for key in loc[:-1]:
-                node = node[key]
-
-            try:
-                line_number = node.lc.data[loc[-1]][0] + 1
-            except (KeyError, IndexError, TypeError, AttributeError):
-                line_number = None
+                message = f"Missing element '{missing_element}' in '{parent_element}' (line unknown)"
 
-            if line_number is not None:
-                error_messages.append(
-                        f"Invalid type for '{loc[-1]}' at line {line_number}: {msg}"
-                    )
+        else:
+            line_number = locations.line(root + tuple(loc)) if loc else None
+            if token_line is not None:
+                line_number = token_line
+
+            if is_type_error:
+                key = loc[-1] if loc else None
+                if line_number is not None:
+                    message = f"Invalid type for '{key}' at line {line_number}: {msg}"
+                else:
+                    message = f"Invalid type for '{key}' (line unknown): {msg}"
+            elif column is not None:
+                message = f"{msg} at line number {line_number}, column {column}"
+            elif line_number is not None:
+                message = f"{msg} at line number {line_number}"
             else:
-                error_messages.append(
-                        f"Invalid type for '{loc[-1]}' (line unknown): {msg}"
-                    )
-
-        elif _type == "table_name_mismatch":
-            if len(loc) == 1:
-                key = loc[0]
-                line_number = get_top_level_line(key)
-                error_messages.append(f"{msg} at or near line {line_number}")
-                continue
-
-            node = yaml_file
-            keys = list(node.keys())
-            node = node[keys[0]]
-
-            for key in loc[:-1]:
-                node = node[key]
+                message = f"{msg} at unknown line"
 
-            key_for_line = loc[-1] if loc else keys[0]
+        issues.append(ValidationIssue(source.path, _type or "validation_error", loc, line_number, message,
+                                      column=column, end_column=end_column))
+        
+    return issues
 
-            try:
-                line_number = node.lc.data[key_for_line][0] + 1
-            except (KeyError, IndexError, TypeError, AttributeError):
-                line_number = None
 
-            if line_number is not None:
-                error_messages.append(f"{msg} at line number {line_number}")
-            else:
-                error_messages.append(f"{msg} at unknown line")
+def decipher_error_messages(yaml_path: DocumentInput, errors: List[Dict[str, str]]) -> List[str]:
+    issues = decipher_issues(yaml_path, errors)
+    # Structured copies go to the active collect_issues() block, if any.
+    record_issues(issues)
+    return [issue.message for issue in issues]
 
-        else:
-            if len(loc) == 1:
-                key = loc[0]
-                line_number = get_top_level_line(key)
-                error_messages.append(f"{msg} at or near line {line_number}")
-                continue
 
-            node = yaml_file
-            keys = list(node.keys())
-            node = node[keys[0]]
 
-            for key in loc[:-1]:
-                node = node[key]
+_STDOUT = object()
 
-            try:
-                line_number = node.lc.data[loc[-1]][0] + 1
-            except (KeyError, IndexError, TypeError, AttributeError):
-                line_number = None
+# PYVALIDATOR_NO_SECTIONS=1 silences the sections in this process and in pool workers.
+_section_output = None if os.environ.get("PYVALIDATOR_NO_SECTIONS") else _STDOUT
 
-            if line_number is not None:
-                error_messages.append(f"{msg} at line number {line_number}")
-            else:
-                error_messages.append(f"{msg} at unknown line")
-        
-    return error_messages
 
+def set_section_output(stream: Optional[TextIO] = _STDOUT):
+    """Send decorated sections to ``stream``, to stdout (the default) or nowhere (``None``)."""
+    global _section_output
+    _section_output = stream
 
 
+@profiled("output.sections")
 def print_decorated_section(title: str, content = None):
+    stream = _section_output
+    if stream is None:
+        return
+    if stream is _STDOUT:
+        stream = sys.stdout
+
     border = "=" * 60
     separator = "-" * 60
-    print(f"\n{border}")
-    print(f"{title.center(60)}")
-    print(f"{separator}")
+    lines = [f"\n{border}", f"{title.center(60)}", f"{separator}"]
     if content:
         for line in content:
-            print(f"  • {line}")
-    print(f"{border}\n")
+            lines.append(f"  • {line}")
+    lines.append(f"{border}\n")
+    stream.write("\n".join(lines) + "\n")
 
 
 
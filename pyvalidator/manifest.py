@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, Iterable, List, Optional
+
+from pyvalidator.ddl_cache import DEFAULT_CACHE_DIR
+
+
+MANIFEST_VERSION = 2
+# Installed packages whose behaviour shows up in validation results.
+VALIDATION_PACKAGES = ("pydantic", "ruamel.yaml", "simple-ddl-parser")
+
+
+def file_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's content, or ``None`` when it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def validator_version() -> str:
+    """Digest of the validator's own code and of the packages it validates with.
+
+    Any change to either may change a result, so it invalidates the whole manifest.
+    """
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name in sorted(os.listdir(package_dir)):
+        if file_name.endswith(".py"):
+            digest.update(file_name.encode())
+            digest.update((file_hash(os.path.join(package_dir, file_name)) or "").encode())
+    for package in VALIDATION_PACKAGES:
+        try:
+            package_version = version(package)
+        except PackageNotFoundError:
+            package_version = "unknown"
+        digest.update(f"{package}=={package_version}".encode())
+    return digest.hexdigest()
+
+
+def default_manifest_path() -> str:
+    """``manifest.json`` in the cache directory configured by ``PYVALIDATOR_CACHE_DIR``."""
+    return os.path.join(os.environ.get("PYVALIDATOR_CACHE_DIR", DEFAULT_CACHE_DIR), "manifest.json")
+
+
+class ValidationManifest():
+    """Content hashes and results from the previous run, stored as JSON.
+
+    Each entry records the hash of the validated file and of every file it
+    depends on (the DDL of a schema, the sources of a semantics file). An
+    entry whose fingerprint still matches is replayed instead of re-validated.
+    The dependency list of a file is stored too, under that file's own hash,
+    so unchanged files are not parsed to find their dependencies. A manifest
+    written by another ``validator_version`` is ignored.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_manifest_path()
+        self.validator = validator_version()
+        self.entries: Dict[str, Dict] = {}
+        self.dependencies: Dict[str, Dict] = {}
+        self._hashes: Dict[str, Optional[str]] = {}
+        self._used_dependencies = set()
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Anything but a manifest of this version and validator starts empty.
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION \
+                or data.get("validator") != self.validator:
+            return
+        entries, dependencies = data.get("entries", {}), data.get("dependencies", {})
+        if isinstance(entries, dict) and isinstance(dependencies, dict):
+            self.entries = entries
+            self.dependencies = dependencies
+
+    def file_hash(self, path: str) -> Optional[str]:
+        path = os.path.abspath(path)
+        if path not in self._hashes:
+            self._hashes[path] = file_hash(path)
+        return self._hashes[path]
+
+    def fingerprint(self, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        return {os.path.abspath(path): self.file_hash(path) for path in paths}
+
+    def lookup_dependencies(self, path: str) -> Optional[List[str]]:
+        """Dependencies recorded for ``path`` while its content had the hash it has now."""
+        path = os.path.abspath(path)
+        stored = self.dependencies.get(path)
+        if stored is None or stored.get("hash") != self.file_hash(path):
+            return None
+        self._used_dependencies.add(path)
+        return stored["paths"]
+
+    def record_dependencies(self, path: str, dependencies: List[str]):
+        path = os.path.abspath(path)
+        self.dependencies[path] = {"hash": self.file_hash(path), "paths": list(dependencies)}
+        self._used_dependencies.add(path)
+
+    def lookup(self, key: str, fingerprint: Dict[str, Optional[str]]) -> Optional[Dict]:
+        entry = self.entries.get(key)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        return entry["result"]
+
+    def record(self, key: str, fingerprint: Dict[str, Optional[str]], result: Dict):
+        # Profiles describe one run only; a cached replay has nothing to time.
+        result = {name: value for name, value in result.items() if name != "profile"}
+        self.entries[key] = {"fingerprint": fingerprint, "result": result}
+
+    def prune(self, keys: Iterable[str]):
+        keep = set(keys)
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keep}
+        self.dependencies = {path: stored for path, stored in self.dependencies.items()
+                             if path in self._used_dependencies}
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "validator": self.validator,
+                       "entries": self.entries, "dependencies": self.dependencies}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,221 @@
+import cProfile
+import functools
+import glob
+import os
+import pstats
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class _State():
+    def __init__(self):
+        self.enabled = bool(os.environ.get("PYVALIDATOR_PROFILE"))
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        # Phases nest per thread; a phase open on one thread is never the parent of another thread's.
+        self._local = threading.local()
+
+    @property
+    def stack(self) -> List["_Timer"]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+
+_state = _State()
+
+
+class _NullTimer():
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer():
+    """Times one phase. Time spent in nested phases is charged to them, not to this one."""
+
+    __slots__ = ("name", "start", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.children = 0.0
+
+    def __enter__(self):
+        _state.stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _state.stack
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+        entry = _state.phases.get(self.name)
+        if entry is None:
+            entry = _state.phases[self.name] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed - self.children
+        return False
+
+
+def phase(name: str):
+    """``with phase("ddl.parse"):`` -- a shared no-op unless profiling is enabled."""
+    if not _state.enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def profiled(name: str):
+    """Decorator form of ``phase`` for whole functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            with _Timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, amount: int = 1):
+    if _state.enabled:
+        _state.counters[name] = _state.counters.get(name, 0) + amount
+
+
+def enable():
+    # Exported through the environment so pool workers pick it up as well.
+    os.environ["PYVALIDATOR_PROFILE"] = "1"
+    _state.enabled = True
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def reset():
+    _state.phases = {}
+    _state.counters = {}
+
+
+def snapshot() -> Dict:
+    """Phase self-times and counters recorded since the last ``reset``, in a picklable form."""
+    return {
+        "phases": {name: list(entry) for name, entry in _state.phases.items()},
+        "counters": dict(_state.counters),
+    }
+
+
+# One cProfile.Profile per process, switched on around each registry entry.
+_profiler: Optional[cProfile.Profile] = None
+
+
+def _profile_dump_path() -> Optional[str]:
+    return os.environ.get("PYVALIDATOR_PROFILE_DUMP") or None
+
+
+class EntryProfile():
+    """Profiles one registry entry: phase breakdown, wall time and, optionally, cProfile data.
+
+    cProfile data accumulates per process in ``<dump>.<pid>.part`` files that
+    ``merge_cprofile_dumps`` combines once the run is over.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __enter__(self):
+        global _profiler
+        reset()
+        dump = _profile_dump_path()
+        if dump:
+            if _profiler is None:
+                _profiler = cProfile.Profile()
+            _profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        dump = _profile_dump_path()
+        if dump and _profiler is not None:
+            _profiler.disable()
+            _profiler.dump_stats(f"{dump}.{os.getpid()}.part")
+        return False
+
+    def result(self) -> Dict:
+        return dict(snapshot(), seconds=self.seconds)
+
+
+def discard_cprofile_parts(dump: str):
+    for part in glob.glob(glob.escape(dump) + ".*.part"):
+        os.remove(part)
+
+
+def merge_cprofile_dumps(dump: str) -> Optional[str]:
+    """Combine the per-process cProfile parts into ``dump`` and remove them."""
+    parts = sorted(glob.glob(glob.escape(dump) + ".*.part"))
+    if not parts:
+        return None
+    stats = pstats.Stats(parts[0])
+    for part in parts[1:]:
+        stats.add(part)
+    stats.dump_stats(dump)
+    for part in parts:
+        os.remove(part)
+    return dump
+
+
+class ProfileReport():
+    """Aggregates the per-entry profiles returned by the runner."""
+
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.files: List[tuple] = []
+        self.total = 0.0
+
+    def add(self, result: Dict):
+        profile = result.get("profile")
+        if not profile or result.get("cached"):
+            return
+        for name, (calls, seconds) in profile["phases"].items():
+            entry = self.phases.setdefault(name, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+        for name, value in profile["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.files.append((profile["seconds"], result.get("kind"), result.get("path") or result.get("name")))
+        self.total += profile["seconds"]
+
+    def format(self, top: int = 10) -> str:
+        lines = [f"Profile: {len(self.files)} entries, {self.total * 1000:.1f} ms in validators (self time per phase)"]
+        lines.append(f"  {'phase':<22} {'calls':>8} {'ms':>10} {'%':>6}")
+        tracked = 0.0
+        for name, (calls, seconds) in sorted(self.phases.items(), key=lambda item: -item[1][1]):
+            tracked += seconds
+            share = seconds / self.total * 100 if self.total else 0.0
+            lines.append(f"  {name:<22} {calls:>8} {seconds * 1000:>10.1f} {share:>6.1f}")
+        other = max(0.0, self.total - tracked)
+        share = other / self.total * 100 if self.total else 0.0
+        lines.append(f"  {'(other)':<22} {'':>8} {other * 1000:>10.1f} {share:>6.1f}")
+
+        if self.counters:
+            lines.append("  counters: " + ", ".join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+
+        if top and self.files:
+            lines.append(f"Slowest {min(top, len(self.files))} files:")
+            for seconds, kind, path in sorted(self.files, key=lambda item: -item[0])[:top]:
+                lines.append(f"  {seconds * 1000:>9.1f} ms  {kind:<9} {path}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+import difflib
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+
+SOURCE_SECTIONS = ("columns", "attributes", "metrics")
+
+
+class ReferenceIndex():
+    """Frozen hash index of every identifier a semantics file may reference.
+
+    Maps each identifier to where it came from: ``"attribute"``, ``"metric"``
+    or ``"source:<name>"`` for columns, attributes and metrics of a resolved
+    source. Membership is a dict lookup. Suggestions for unknown identifiers
+    only compare against names of similar length and are memoized.
+    """
+
+    def __init__(self, origins: Mapping[str, Tuple[str, ...]]):
+        self._origins = MappingProxyType(dict(origins))
+        self._folded = {}
+        self._by_length: Dict[int, List[str]] = {}
+        for name in self._origins:
+            self._folded.setdefault(name.lower(), name)
+            self._by_length.setdefault(len(name), []).append(name)
+        self._suggestions: Dict[str, Tuple[str, ...]] = {}
+
+    @classmethod
+    def build(cls, attributes: Iterable[str], metrics: Iterable[str], sources: Mapping[str, Dict]) -> "ReferenceIndex":
+        origins: Dict[str, Tuple[str, ...]] = {}
+
+        def add(name, origin):
+            # Keys such as 1 or null are not strings in YAML; references always are.
+            name = str(name)
+            current = origins.get(name, ())
+            if origin not in current:
+                origins[name] = current + (origin,)
+
+        for name in attributes:
+            add(name, "attribute")
+        for name in metrics:
+            add(name, "metric")
+        for source_name, source in sources.items():
+            if not isinstance(source, dict):
+                continue
+            for section in SOURCE_SECTIONS:
+                for name in source.get(section) or {}:
+                    add(name, f"source:{source_name}")
+        return cls(origins)
+
+    def __contains__(self, name) -> bool:
+        return name in self._origins
+
+    def __len__(self) -> int:
+        return len(self._origins)
+
+    def __iter__(self):
+        return iter(self._origins)
+
+    def origins(self, name: str) -> Tuple[str, ...]:
+        return self._origins.get(name, ())
+
+    def suggest(self, name: str, limit: int = 1) -> Tuple[str, ...]:
+        """Closest known identifiers to ``name``, best match first."""
+        cached = self._suggestions.get(name)
+        if cached is None:
+            folded = self._folded.get(name.lower())
+            if folded is not None:
+                cached = (folded,)
+            else:
+                candidates = []
+                for length in range(len(name) - 2, len(name) + 3):
+                    candidates.extend(self._by_length.get(length, ()))
+                cached = tuple(difflib.get_close_matches(name, candidates, n=3, cutoff=0.75))
+            self._suggestions[name] = cached
+        return cached[:limit]
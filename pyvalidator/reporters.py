@@ -0,0 +1,138 @@
+import json
+import os
+from typing import Dict, List, TextIO
+
+from pyvalidator.results import ValidationIssue, result_issues
+
+
+class Reporter():
+    """Receives runner results and writes them somewhere.
+
+    ``streaming`` reporters are handed each result as soon as it is ready;
+    the others get them in registry order once the run is over.
+    """
+
+    streaming = False
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def report(self, result: Dict):
+        raise NotImplementedError
+
+    def finish(self, summary: Dict[str, int]):
+        pass
+
+
+class PrettyReporter(Reporter):
+    """The decorated console sections printed by each validator, then a one-line summary.
+
+    With ``buffered`` everything is written in one go when the run finishes.
+    """
+
+    def __init__(self, stream: TextIO, buffered: bool = False):
+        super().__init__(stream)
+        self.buffered = buffered
+        self._chunks: List[str] = []
+
+    def _write(self, text: str):
+        if self.buffered:
+            self._chunks.append(text)
+        else:
+            self.stream.write(text)
+
+    def report(self, result: Dict):
+        self._write(result.get("output", ""))
+
+    def finish(self, summary: Dict[str, int]):
+        self._write(f"Validated {summary['entries']} entries ({summary['cached']} unchanged), "
+                    f"{summary['failed']} with errors.\n")
+        if self._chunks:
+            self.stream.write("".join(self._chunks))
+            self._chunks = []
+        self.stream.flush()
+
+
+class JsonlReporter(Reporter):
+    """One JSON object per issue, flushed entry by entry, and a closing summary object."""
+
+    streaming = True
+
+    def report(self, result: Dict):
+        issues = result_issues(result)
+        if not issues:
+            return
+        self.stream.write("".join(
+            json.dumps(dict(issue.to_dict(), type="issue", cached=bool(result.get("cached")))) + "\n"
+            for issue in issues
+        ))
+        self.stream.flush()
+
+    def finish(self, summary: Dict[str, int]):
+        self.stream.write(json.dumps(dict(summary, type="summary")) + "\n")
+        self.stream.flush()
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+class SarifReporter(Reporter):
+    """A SARIF 2.1.0 log with one rule per error type, for code-scanning uploads."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.issues: List[ValidationIssue] = []
+
+    def report(self, result: Dict):
+        self.issues.extend(result_issues(result))
+
+    @staticmethod
+    def _uri(path: str) -> str:
+        if os.path.isabs(path):
+            try:
+                path = os.path.relpath(path)
+            except ValueError:
+                pass
+        return path.replace(os.sep, "/")
+
+    def _result(self, issue: ValidationIssue) -> Dict:
+        sarif_result = {"ruleId": issue.rule, "level": "error", "message": {"text": issue.message}}
+        if issue.file:
+            location = {"physicalLocation": {"artifactLocation": {"uri": self._uri(issue.file)}}}
+            if issue.line:
+                region = {"startLine": issue.line}
+                if issue.column:
+                    # SARIF end columns are exclusive.
+                    region.update(startColumn=issue.column, endColumn=issue.end_column + 1)
+                location["physicalLocation"]["region"] = region
+            if issue.loc:
+                location["logicalLocations"] = [{"fullyQualifiedName": ".".join(str(part) for part in issue.loc)}]
+            sarif_result["locations"] = [location]
+        return sarif_result
+
+    def finish(self, summary: Dict[str, int]):
+        rules = sorted({issue.rule for issue in self.issues})
+        log = {
+            "$schema": SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {"name": "pyvalidator", "rules": [{"id": rule} for rule in rules]}},
+                "results": [self._result(issue) for issue in self.issues],
+            }],
+        }
+        json.dump(log, self.stream, indent=2)
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+FORMATS = ("pretty", "jsonl", "sarif")
+
+
+def create_reporter(output_format: str, stream: TextIO, buffered: bool = False) -> Reporter:
+    if output_format == "pretty":
+        return PrettyReporter(stream, buffered=buffered)
+    if output_format == "jsonl":
+        return JsonlReporter(stream)
+    if output_format == "sarif":
+        return SarifReporter(stream)
+    raise ValueError(f"Unknown output format '{output_format}'. Expected one of: {', '.join(FORMATS)}")
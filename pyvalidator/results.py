@@ -0,0 +1,114 @@
+import contextlib
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class ValidationIssue():
+    """One reported problem: where it is, which rule raised it and the message shown to the user."""
+
+    __slots__ = ("file", "rule", "loc", "line", "message", "kind", "entry", "column", "end_column")
+
+    def __init__(self, file: Optional[str], rule: str, loc: Iterable = (), line: Optional[int] = None,
+                 message: str = "", kind: Optional[str] = None, entry: Optional[str] = None,
+                 column: Optional[int] = None, end_column: Optional[int] = None):
+        self.file = file
+        self.rule = rule
+        self.loc = tuple(loc)
+        self.line = line
+        self.message = message
+        self.kind = kind
+        self.entry = entry
+        # One-based columns of the offending token on ``line``; ``end_column`` is inclusive.
+        self.column = column
+        self.end_column = end_column
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "entry": self.entry,
+            "file": self.file,
+            "rule": self.rule,
+            "loc": list(self.loc),
+            "line": self.line,
+            "column": self.column,
+            "end_column": self.end_column,
+            "message": self.message,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ValidationIssue":
+        return cls(data.get("file"), data.get("rule") or "validation_error", data.get("loc") or (),
+                   data.get("line"), data.get("message", ""), data.get("kind"), data.get("entry"),
+                   data.get("column"), data.get("end_column"))
+
+    def __repr__(self):
+        return f"ValidationIssue({self.file!r}, {self.rule!r}, line={self.line}, message={self.message!r})"
+
+
+# Issues are recorded where the line numbers are worked out (decipher_error_messages)
+# and picked up by whoever opened the innermost collect_issues() on this thread.
+_local = threading.local()
+
+
+def _collectors() -> List[List[ValidationIssue]]:
+    stack = getattr(_local, "collectors", None)
+    if stack is None:
+        stack = _local.collectors = []
+    return stack
+
+
+@contextlib.contextmanager
+def collect_issues() -> Iterator[List[ValidationIssue]]:
+    issues: List[ValidationIssue] = []
+    stack = _collectors()
+    stack.append(issues)
+    try:
+        yield issues
+    finally:
+        stack.pop()
+
+
+def record_issues(issues: Iterable[ValidationIssue]):
+    stack = _collectors()
+    if stack:
+        stack[-1].extend(issues)
+
+
+def match_issues(result: Dict, collected: Iterable[ValidationIssue]) -> List[ValidationIssue]:
+    """Pair each error message of a result with the issue recorded for it.
+
+    Messages that never went through ``decipher_error_messages`` (an aborted
+    validation, for instance) become issues without a rule-specific type or line.
+    """
+    by_message: Dict[str, List[ValidationIssue]] = {}
+    for issue in collected:
+        by_message.setdefault(issue.message, []).append(issue)
+
+    issues = []
+    for message in result.get("errors") or []:
+        candidates = by_message.get(message)
+        if candidates:
+            issue = candidates.pop(0)
+        else:
+            issue = ValidationIssue(result.get("path"), "validation_error", message=str(message))
+        issue.kind = result.get("kind")
+        issue.entry = result.get("name")
+        issues.append(issue)
+    return issues
+
+
+def result_issues(result: Dict) -> List[ValidationIssue]:
+    """Issues of a runner result, rebuilt from its messages when it predates structured issues."""
+    if "issues" in result:
+        return [ValidationIssue.from_dict(issue) for issue in result["issues"]]
+    return match_issues(result, ())
+
+
+def summarize(results: List[Dict]) -> Dict[str, int]:
+    return {
+        "entries": len(results),
+        "cached": sum(1 for result in results if result.get("cached")),
+        "failed": sum(1 for result in results if result.get("errors")),
+        "issues": sum(len(result.get("errors") or []) for result in results),
+    }
+
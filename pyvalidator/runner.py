@@ -0,0 +1,273 @@
+import contextlib
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from logger.log import init_worker_logging, log_queue
+from pyvalidator.ddl_index import DDLIndex
+from pyvalidator.document_cache import load_yaml
+from pyvalidator.expression_tokenizer import Reference, extract_registry_references
+from pyvalidator.format_validator import validate_schema_format, validate_semantic_format
+from pyvalidator.manifest import ValidationManifest
+from pyvalidator import profiling
+from pyvalidator.results import collect_issues, match_issues
+from pyvalidator.schema_validator import main as validate_schema_ddl
+from pyvalidator.semantic_validator import SemanticsValidator, source_path
+from pyvalidator.source_graph import SourceGraph, resolve_yaml_path
+
+
+KINDS = ("schema", "semantics")
+
+# Per-process catalogue of DDL dumps; loaded in the parent before the pool
+# starts so forked workers inherit it instead of re-reading the dump.
+_ddl_indexes: Dict[str, DDLIndex] = {}
+
+
+def load_ddl_index(ddl_dump: str) -> DDLIndex:
+    ddl_index = _ddl_indexes.get(ddl_dump)
+    if ddl_index is None:
+        ddl_index = _ddl_indexes[ddl_dump] = DDLIndex.from_file(ddl_dump)
+    return ddl_index
+
+
+# Same idea for the semantics source graph: built once per registry.
+_source_graphs: Dict[str, SourceGraph] = {}
+
+
+def load_source_graph(metadata_path: str) -> SourceGraph:
+    graph = _source_graphs.get(metadata_path)
+    if graph is None:
+        graph = SourceGraph.from_registry(metadata_path, load_registry(metadata_path))
+        _source_graphs[metadata_path] = graph
+    return graph
+
+
+# References of every semantics file, extracted in one batched pass per registry.
+# Each list is kept with the parsed document it came from, so an edited file is tokenized again.
+_registry_references: Dict[str, Dict[str, Tuple[Any, List[Reference]]]] = {}
+
+
+def load_registry_references(metadata_path: str) -> Dict[str, Tuple[Any, List[Reference]]]:
+    references = _registry_references.get(metadata_path)
+    if references is None:
+        documents = {}
+        bodies = {}
+        for name in load_registry(metadata_path):
+            try:
+                document = load_yaml(resolve_yaml_path(os.path.join(metadata_path, "semantics"), name))
+                body = next(iter(document.values()))
+            except Exception:
+                # Unreadable files are reported when they are validated.
+                continue
+            if isinstance(body, dict):
+                documents[name], bodies[name] = document, body
+        references = {name: (documents[name], extracted)
+                      for name, extracted in extract_registry_references(bodies).items()}
+        _registry_references[metadata_path] = references
+    return references
+
+
+def semantics_references(metadata_path: str, name: str, document: Any) -> Optional[List[Reference]]:
+    """The batch-extracted references of ``name``, if they were taken from this very ``document``."""
+    stored = load_registry_references(metadata_path).get(name)
+    if stored is not None and stored[0] is document:
+        return stored[1]
+    return None
+
+
+def forget_cached(metadata_path: Optional[str] = None, ddl_dump: Optional[str] = None):
+    """Drop the memoized source graph and references of ``metadata_path`` and/or the catalogue of ``ddl_dump``."""
+    if metadata_path is not None:
+        _source_graphs.pop(metadata_path, None)
+        _registry_references.pop(metadata_path, None)
+    if ddl_dump is not None:
+        _ddl_indexes.pop(ddl_dump, None)
+
+
+def load_registry(metadata_path: str) -> List[str]:
+    registry = load_yaml(os.path.join(metadata_path, "registry.yml"))
+    return list(registry.get("registered_yml", None) or [])
+
+
+def validate_schema_entry(metadata_path: str, name: str, ddl_dir: str = "ddl",
+                          ddl_dump: Optional[str] = None, dialect: Optional[str] = None) -> Dict:
+    schema_path = resolve_yaml_path(os.path.join(metadata_path, "schema"), name)
+    ddl_path = os.path.join(metadata_path, ddl_dir, name + ".sql")
+
+    errors = validate_schema_format(schema_path)
+    if not errors:
+        ddl_index = load_ddl_index(ddl_dump) if ddl_dump else None
+        errors = validate_schema_ddl(ddl_path, schema_path, ddl_index=ddl_index, dialect=dialect)
+    else:
+        print("Correct Format for Schema before passing it to validate against DDL")
+    return {"kind": "schema", "name": name, "path": schema_path, "errors": errors or []}
+
+
+def validate_semantics_entry(metadata_path: str, name: str) -> Dict:
+    semantic_path = resolve_yaml_path(os.path.join(metadata_path, "semantics"), name)
+
+    errors = validate_semantic_format(semantic_path)
+    if not errors:
+        validator = SemanticsValidator(source_graph=load_source_graph(metadata_path))
+        references = semantics_references(metadata_path, name, load_yaml(semantic_path))
+        errors = validator.validate_semantics(metadata_path, semantic_path, references=references)
+    else:
+        print("Correct Format Before passing it to validate against schema")
+    return {"kind": "semantics", "name": name, "path": semantic_path, "errors": errors or []}
+
+
+def entry_dependencies(task, manifest: Optional[ValidationManifest] = None) -> List[str]:
+    """Files whose content decides the outcome of validating one registry entry.
+
+    A schema depends on itself and its DDL; a semantics file on itself and
+    every source named in its ``source:`` block. With a ``manifest``, the
+    sources of an unchanged semantics file are taken from it instead of
+    parsing the file.
+    """
+    kind, metadata_path, name, ddl_dir, ddl_dump, _ = task
+    if kind == "schema":
+        schema_path = resolve_yaml_path(os.path.join(metadata_path, "schema"), name)
+        return [schema_path, ddl_dump or os.path.join(metadata_path, ddl_dir, name + ".sql")]
+
+    semantic_path = resolve_yaml_path(os.path.join(metadata_path, "semantics"), name)
+    if manifest is not None:
+        dependencies = manifest.lookup_dependencies(semantic_path)
+        if dependencies is not None:
+            return dependencies
+
+    dependencies = [semantic_path]
+    try:
+        yaml_file = load_yaml(semantic_path)
+        generated_semantics = yaml_file.get(list(yaml_file.keys())[0])
+        sources = generated_semantics.get("source") or {}
+    except Exception:
+        # Unreadable files are re-validated whenever their own content changes.
+        sources = {}
+    dependencies.extend(source_path(metadata_path, source_key) for source_key in sources)
+    if manifest is not None:
+        manifest.record_dependencies(semantic_path, dependencies)
+    return dependencies
+
+
+def run_entry(task) -> Dict:
+    """Validate one registry entry, capturing everything it prints.
+
+    Runs inside pool workers, so the decorated sections are buffered and
+    returned with the result instead of interleaving on the shared stdout.
+    """
+    kind, metadata_path, name, ddl_dir, ddl_dump, dialect = task
+    buf = io.StringIO()
+    entry_profile = profiling.EntryProfile() if profiling.is_enabled() else contextlib.nullcontext()
+    with contextlib.redirect_stdout(buf), collect_issues() as collected, entry_profile:
+        try:
+            if kind == "schema":
+                result = validate_schema_entry(metadata_path, name, ddl_dir, ddl_dump, dialect)
+            else:
+                result = validate_semantics_entry(metadata_path, name)
+        except Exception as e:
+            result = {"kind": kind, "name": name, "path": None,
+                      "errors": [f"Validation aborted: {type(e).__name__}: {e}"]}
+    result["issues"] = [issue.to_dict() for issue in match_issues(result, collected)]
+    result["output"] = buf.getvalue()
+    if isinstance(entry_profile, profiling.EntryProfile):
+        result["profile"] = entry_profile.result()
+    return result
+
+
+def _run_tasks(tasks, workers: int) -> Iterator[Dict]:
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield run_entry(task)
+        return
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    pool_options = {}
+    queue = log_queue()
+    if queue is not None and hasattr(queue, "cancel_join_thread"):
+        # Workers log through the parent's listener instead of writing files themselves.
+        pool_options = {"initializer": init_worker_logging,
+                        "initargs": (queue, logging.getLogger().level)}
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), **pool_options) as executor:
+        yield from executor.map(run_entry, tasks, chunksize=chunksize)
+
+
+def manifest_key(task) -> str:
+    """Manifest key of a task; schema results also depend on the SQL dialect they were checked with."""
+    kind, _, name, _, _, dialect = task
+    if kind == "schema" and dialect:
+        return f"{kind}:{name}:{dialect}"
+    return f"{kind}:{name}"
+
+
+def run_registry(metadata_path: str, kinds=KINDS, workers: Optional[int] = None,
+                 ddl_dir: str = "ddl", ddl_dump: Optional[str] = None,
+                 manifest: Optional[ValidationManifest] = None,
+                 on_result: Optional[Callable[[Dict], None]] = None,
+                 dialect: Optional[str] = None) -> List[Dict]:
+    """Validate every registered entry, fanning the work out over a process pool.
+
+    Results come back in registry order (schemas first, then semantics)
+    regardless of which worker finished first. With ``ddl_dump`` every
+    schema is checked against one catalogue built from that file instead of
+    its own ``<ddl_dir>/<name>.sql``. ``dialect`` selects the SQL type
+    aliases schemas are compared with.
+
+    When a ``manifest`` is given, entries whose file and dependency hashes
+    are unchanged since the last run replay their stored result (marked with
+    ``"cached": True``) and only the rest are validated. The manifest is
+    updated but not saved; that is left to the caller.
+
+    ``on_result`` is called with each result as soon as it is available,
+    which is not registry order.
+    """
+    names = load_registry(metadata_path)
+    tasks = [(kind, metadata_path, name, ddl_dir, ddl_dump, dialect) for kind in kinds for name in names]
+    if not tasks:
+        return []
+
+    results: List[Optional[Dict]] = [None] * len(tasks)
+    pending = list(range(len(tasks)))
+    fingerprints = {}
+
+    if manifest is not None:
+        pending = []
+        for i, task in enumerate(tasks):
+            fingerprints[i] = manifest.fingerprint(entry_dependencies(task, manifest))
+            cached = manifest.lookup(manifest_key(task), fingerprints[i])
+            if cached is not None:
+                results[i] = dict(cached, cached=True)
+                if on_result is not None:
+                    on_result(results[i])
+            else:
+                pending.append(i)
+
+    if ddl_dump and any(tasks[i][0] == "schema" for i in pending):
+        load_ddl_index(ddl_dump)
+
+    if any(tasks[i][0] == "semantics" for i in pending):
+        # Run semantics in dependency order and resolve every shared source
+        # once up front so forked workers inherit the loaded graph.
+        graph = load_source_graph(metadata_path)
+        rank = {name: position for position, name in enumerate(graph.semantics_order(names))}
+        pending.sort(key=lambda i: (tasks[i][0] == "semantics", rank.get(tasks[i][2], 0)))
+        for node in graph.topological_order():
+            if not node.startswith("semantics."):
+                try:
+                    graph.resolve(node)
+                except OSError:
+                    pass
+        load_registry_references(metadata_path)
+
+    fresh = _run_tasks([tasks[i] for i in pending], workers or os.cpu_count() or 1)
+    for i, result in zip(pending, fresh):
+        results[i] = result
+        if manifest is not None:
+            manifest.record(manifest_key(tasks[i]), fingerprints[i], result)
+        if on_result is not None:
+            on_result(result)
+
+    if manifest is not None:
+        manifest.prune(manifest_key(task) for task in tasks)
+    return results
@@ -1,76 +1,98 @@
-import yaml
-from typing import List, Dict
-from pyvalidator.format_validator import SchemaWrapper, GeneratedSchema, TableInfo, Column
-from simple_ddl_parser import DDLParser
+from pyvalidator.format_validator import GeneratedSchema, root_errors, validate_body
 from pprint import pprint
-from ruamel.yaml import YAML
 from ruamel.yaml.constructor import DuplicateKeyError
-import sys
 from pyvalidator.helpers import decipher_error_messages, print_decorated_section
-
-
-
-def parse_ddl_to_metadata(ddl:str):
-    return DDLParser(ddl).run(output_mode="hql")
+from pyvalidator.document_source import DocumentInput, as_source
+from pyvalidator.ddl_index import DDLIndex, parse_ddl_to_metadata
+from pyvalidator.profiling import count, profiled
+from pyvalidator.type_system import GENERIC_TYPE_FAMILIES, TypeSystem, get_type_system
 
 
 
 class SchemaValidator():
     
-    TYPE_EQUIVALENTS = {
-        "NUMBER": {"DECIMAL", "FLOAT", "NUMBER", "DOUBLE", "NUMERIC"},
-        "INT": {"INT", "INTEGER", "BIGINT", "SMALLINT"},
-        "VARCHAR": {"VARCHAR", "TEXT", "STRING", "CHAR"},
-        "DATE": {"DATE", "DATETIME", "TIMESTAMP"}
-    }
+    TYPE_EQUIVALENTS = GENERIC_TYPE_FAMILIES
     
-    def __init__(self, ddls=None):
-        self.ddl = parse_ddl_to_metadata(ddls)
+    def __init__(self, ddls=None, ddl_index: DDLIndex = None, dialect=None):
+        if ddl_index is None:
+            ddl_index = DDLIndex(parse_ddl_to_metadata(ddls))
+        self.ddl_index = ddl_index
+        self.ddl = ddl_index.raw()
+        if dialect is None and self.TYPE_EQUIVALENTS is not GENERIC_TYPE_FAMILIES:
+            # Subclasses overriding TYPE_EQUIVALENTS keep working.
+            dialect = TypeSystem(self.TYPE_EQUIVALENTS, name=type(self).__name__)
+        self.type_system = get_type_system(dialect)
     
     def print_ddl(self):
         pprint(self.ddl)
         
     def types_are_equivalent(self, ddl_type: str, schema_type: str) -> bool:
-        ddl_type = ddl_type.upper()
-        schema_type = schema_type.upper()
-        for equivalents in self.TYPE_EQUIVALENTS.values():
-            if ddl_type in equivalents and schema_type in equivalents:
-                return True
-        return ddl_type == schema_type  # fallback: exact match
+        return self.type_system.equivalent(ddl_type, schema_type)
     
-    def validate_schema(self, schema_path: str):
+    @profiled("ddl.validate")
+    def validate_schema(self, schema_path: DocumentInput):
         errors = []  # collect errors here
         
+        schema_path = as_source(schema_path)
+        generated_schema = schema_path.load()
         
-        with open(schema_path) as f:
-            yaml = YAML()
-            generated_schema = yaml.load(f)
-        
-        schema_key = list(generated_schema.keys())[0]
-        schema = generated_schema[schema_key]
-        
-        try:
-            schema = GeneratedSchema(**schema)
-        except Exception as e:
-            errors.append(f"Schema parsing error: {e}")
-            # If schema itself can't parse, stop validation here
-            return
+        format_errors = root_errors("schema", generated_schema)
+        if not format_errors:
+            schema = next(iter(generated_schema.values()))
+            try:
+                schema = GeneratedSchema(**schema)
+            except Exception as e:
+                # If schema itself can't parse, stop validation here and say why
+                format_errors = validate_body("schema", schema) or [
+                    {"loc": ["root"], "type": "schema_parse_error", "msg": f"Schema parsing error: {e}"}
+                ]
+        if format_errors:
+            errors = decipher_error_messages(yaml_path=schema_path, errors=format_errors)
+            print_decorated_section(title="Schema Validation Errors", content=errors)
+            return errors
         
         schema_table_name = schema.table_info[0].table
+        ddl_table = self.ddl_index.get(schema_table_name)
+
+        if ddl_table is None:
+            candidates = self.ddl_index.ambiguous(schema_table_name)
+            if candidates:
+                error = {
+                    "loc": ('table_info'),
+                    "type" : "ambiguous_table",
+                    "msg": f"Schema table name '{schema_table_name}' matches several DDL tables "
+                           f"({', '.join(candidates)}); qualify it with its schema"
+                }
+                errors = decipher_error_messages(yaml_path=schema_path,errors=[error])
+                print_decorated_section(title="Schema Validation Errors", content=errors)
+                return errors
+
+            if len(self.ddl_index) != 1:
+                error = {
+                    "loc": ('table_info'),
+                    "type" : "table_name_mismatch",
+                    "msg": f"Schema table name '{schema_table_name}' not found in DDL"
+                }
+                errors = decipher_error_messages(yaml_path=schema_path,errors=[error])
+                print_decorated_section(title="Schema Validation Errors", content=errors)
+                return errors
 
-        if schema_table_name != self.ddl[0]["table_name"]:
+            # A single-table DDL is still validated column by column against the schema.
+            ddl_table = self.ddl_index.first()
             error = {
                 "loc": ('table_info'),
                 "type" : "table_name_mismatch",
-                "msg": f"Schema table name '{schema_table_name}' does not match DDL table name '{self.ddl[0]['table_name']}'"
+                "msg": f"Schema table name '{schema_table_name}' does not match DDL table name '{ddl_table.name}'"
             }
             errors.append(error)
         
         schema_columns = {col.column: col for col in schema.columns.values()} 
-        ddl_primary_keys = self.ddl[0]["primary_key"]
+        ddl_columns = ddl_table.columns
+        ddl_primary_keys = ddl_table.primary_key_set
+        count("ddl.columns", len(ddl_columns))
         
         for schema_col_name in schema_columns.keys():
-            if schema_col_name not in {col['name'] for col in self.ddl[0]['columns']}:
+            if schema_col_name not in ddl_columns:
                 error = {
                     "loc": ('columns', schema_col_name),
                     "type": "column_extra_in_schema",
@@ -79,11 +101,12 @@ class SchemaValidator():
                 errors.append(error)
         
         
-        for ddl_col in self.ddl[0]['columns']:
+        for ddl_col in ddl_table.raw['columns']:
             ddl_col_name = ddl_col['name']
             ddl_col_type = ddl_col['type'].upper()
 
-            if ddl_col_name not in schema_columns:
+            schema_col = schema_columns.get(ddl_col_name)
+            if schema_col is None:
                 error = {
                     "loc": ('columns', ddl_col_name),
                     "type" : "column_not_found",
@@ -92,7 +115,7 @@ class SchemaValidator():
                 errors.append(error)
                 continue
 
-            schema_col_type = schema_columns[ddl_col_name].type.upper()
+            schema_col_type = schema_col.type.upper()
             if not self.types_are_equivalent(ddl_col_type, schema_col_type):
                 error = {
                     "loc": ('columns', ddl_col_name),
@@ -117,8 +140,8 @@ class SchemaValidator():
                     }
                     errors.append(error)
             
-            if schema_columns[ddl_col_name].fetch:
-                if schema_columns[ddl_col_name].type.upper() == "NUMBER":
+            if schema_col.fetch:
+                if schema_col_type == "NUMBER":
                     error = {
                         "loc": ('columns', ddl_col_name),
                         "type" : "invalid_fetch",
@@ -137,20 +160,20 @@ class SchemaValidator():
                 
                 
                 
-def main(ddl_path, schema_path):
+def main(ddl_path, schema_path, ddl_index: DDLIndex = None, dialect=None):
 
     print_decorated_section(title="Validating Schema against DDL")
     
-    with open(ddl_path, 'r') as f:
-        ddl = f.read() 
-    
-    ddl_validator = SchemaValidator(ddl)
-
-    yaml = YAML()
-
+    if ddl_index is None:
+        with open(ddl_path, 'r') as f:
+            ddl = f.read() 
+        ddl_validator = SchemaValidator(ddl, dialect=dialect)
+    else:
+        ddl_validator = SchemaValidator(ddl_index=ddl_index, dialect=dialect)
+
+    schema_path = as_source(schema_path)
     try:
-        with open(schema_path,'r') as f:
-            yaml_file = yaml.load(f)  
+        schema_path.load()
     except DuplicateKeyError as e:
         print_decorated_section(title= "Duplicate Key Error", content=[f"Duplicate Key found: {e}"])
         
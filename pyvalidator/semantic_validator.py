@@ -1,20 +1,22 @@
-import re
-from pyvalidator.format_validator import SemanticWrapper, GeneratedSemantics
 from pprint import pprint
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 
-from ruamel.yaml import YAML
+from pyvalidator.format_validator import root_errors, validate_body
 from pyvalidator.helpers import decipher_error_messages, print_decorated_section
-import os
-from io import StringIO
+from pyvalidator.document_source import DocumentInput, as_source
+
+from pyvalidator.source_graph import SourceGraph, load_plain_source, source_path
+from pyvalidator.profiling import count, phase, profiled
+from pyvalidator.reference_index import ReferenceIndex
+from pyvalidator.expression_tokenizer import Reference, extract_references, iter_references
 
-import yaml as pyyaml
 
 class SemanticsValidator:
     
-    def __init__(self):
+    def __init__(self, source_graph: SourceGraph = None):
         self.errors = []
         self.sources = {}
+        self.source_graph = source_graph
         
     # def get_schema_paths(self, semantics_file):
         
@@ -22,73 +24,59 @@ class SemanticsValidator:
     def print_sources(self):
         pprint(self.sources)
 
-    def _parse_sources(self):
-        column_ids = []
-        for key,source in self.sources.items():
-            if source.get("columns",None):
-                columns = list(source["columns"].keys())
-                column_ids.extend(columns)
-            
-            if source.get("attributes", None):
-                columns = list(source["attributes"].keys())
-                column_ids.extend(columns)
-            
-            if source.get("metrics",None):
-                columns = list(source["metrics"].keys())
-                column_ids.extend(columns)
-        return column_ids
-        
-                
     def extract_column_names(self, sql_query: str) -> List[str]:
-        pattern = re.compile(r'\[([^\[\]]+)\]')
-        tokens = pattern.findall(sql_query)
-        return tokens
-
-    def validate_references(self, section:str, references: List[str], valid_keys: List[str], context: str, key: str):
+        return extract_references(sql_query)
+
+    def _invalid_reference(self, section: str, key: str, context: str, ref: str, msg: str, valid_keys, span=None):
+        error = {
+            "loc": (section, key, context, ref),
+            "type": "invalid_reference",
+            "msg": msg
+        }
+        if span is not None:
+            error["span"] = span
+        if isinstance(valid_keys, ReferenceIndex):
+            suggestions = valid_keys.suggest(ref)
+            if suggestions:
+                error["msg"] = f"{msg} Did you mean '{suggestions[0]}'?"
+                error["suggestions"] = list(suggestions)
+        self.errors.append(error)
+
+    def validate_references(self, section:str, references: List[str], valid_keys: ReferenceIndex, context: str, key: str):
         for ref in references:
             if ref not in valid_keys:
-                error = {
-                    "loc": (section, key, context, ref),
-                    "type": "invalid_reference",
-                    "msg": f"Incorrect reference '{ref}' in {context} of '{key}'. Not found in schema."
-                }
-                self.errors.append(error)
-
-    def _validate_item(self, item: Dict, reference_columns: List[str], section: str):
-        for key, values in item.items():
-            if values.get("include"):
-                self.validate_references(section, values["include"], reference_columns, "include", key)
-
-            if values.get("calculation"):
-                columns = self.extract_column_names(values["calculation"])
-                for col in columns:
-                    if col not in reference_columns:
-                        error = {
-                            "loc": (section,key,"calculation", col),
-                            "type": "invalid_reference",
-                            "msg": f"Incorrect reference '{col}' in calculation of '{key}'. Not found in columns/attributes/metrics of any source ."
-                        }
-                        self.errors.append(error)
-
-            if values.get("filter"):
-                for filter_expr in values["filter"]:
-                    columns = self.extract_column_names(filter_expr)
-                    for col in columns:
-                        if col not in reference_columns:
-                            error = {
-                                "loc": (section, key, "filter", col),
-                                "type": "invalid_reference",
-                                "msg": f"Incorrect reference '{col}' in filter of '{key}'. Not found in schema."
-                            }
-                            self.errors.append(error)
+                self._invalid_reference(section, key, context, ref,
+                    f"Incorrect reference '{ref}' in {context} of '{key}'. Not found in schema.", valid_keys)
+
+    def _validate_references(self, references: Iterable[Reference], generated_semantics: Dict,
+                             reference_columns: ReferenceIndex):
+        messages = {
+            "include": "Incorrect reference '{ref}' in include of '{key}'. Not found in schema.",
+            "calculation": "Incorrect reference '{ref}' in calculation of '{key}'. Not found in columns/attributes/metrics of any source .",
+            "filter": "Incorrect reference '{ref}' in filter of '{key}'. Not found in schema.",
+        }
+        for reference in references:
+            if reference.name not in reference_columns:
+                section = reference.section
+                msg = messages[reference.context].format(ref=reference.name, key=reference.key)
+                span = None
+                if reference.span is not None:
+                    # Where the expression sits in the document, so the issue can point at the token.
+                    value_loc = (section, reference.key, reference.context)
+                    if reference.context == "filter":
+                        filters = generated_semantics[section][reference.key]["filter"]
+                        value_loc += (filters.index(reference.expression),)
+                    span = {"loc": value_loc, "start": reference.span[0], "end": reference.span[1]}
+                self._invalid_reference(section, reference.key, reference.context, reference.name, msg,
+                                        reference_columns, span=span)
     
+    def _load_source(self, source_key: str, metadata_path: str) -> Dict:
+        if self.source_graph is not None:
+            return self.source_graph.resolve(source_key)
+        return load_plain_source(source_path(metadata_path, source_key))
+
+    @profiled("semantic.sources")
     def _get_sources(self, sources: dict, metadata_path:str):
-        yaml = YAML()
-        
-        registry_path = os.path.join(metadata_path, "registry.yml")
-        with open(registry_path) as f:
-            registry = yaml.load(f)
-            registries = registry.get("registered_yml", None)
         
         source_keys = list(sources.keys())
         
@@ -102,14 +90,8 @@ class SemanticsValidator:
             file_name = parsed_source.get("file_name",None)
             
             # if file_name in registries:
-            source_path = os.path.join(metadata_path, source_type, file_name + ".yaml")
-            
             try:
-                with open(source_path) as f:
-                    source_raw = yaml.load(f)
-                    buf = StringIO()
-                    yaml.dump(source_raw, buf)
-                    source_raw = pyyaml.safe_load(buf.getvalue())
+                source_raw = self._load_source(f"{source_type}.{file_name}", metadata_path)
             except FileNotFoundError as e:
                 self.errors.append(
                         {
@@ -145,33 +127,26 @@ class SemanticsValidator:
                     
                 
             elif source_type == "semantics":
-                attributes = specified_source.get("attributes", None)
-                metrics = specified_source.get("metrics, None")
-                
-                if attributes:
+                source_raw = source_raw[file_name] if file_name in source_raw else next(iter(source_raw.values()))
 
-                    if attributes == ["<all>"]:
-                        self.sources.update(source_raw)
-                    
-                    else:
-                        for column in attributes:
-                            filtered_columns.append(source_raw["attributes"].get(column, None))
-                            filtered_source.update({"attributes":filtered_columns})
-                            
-                if metrics:
-                    filtered_columns = []
-                    if metrics == ["<all>"]:
-                        self.sources.update(source_raw)
-                    
+                # Source blocks must list `columns`; for a semantics source they
+                # select attributes and metrics unless those are given explicitly.
+                selections = {
+                    "attributes": specified_source.get("attributes") or specified_source.get("columns"),
+                    "metrics": specified_source.get("metrics") or specified_source.get("columns"),
+                }
+                for section, selected in selections.items():
+                    if not selected:
+                        continue
+                    items = source_raw.get(section) or {}
+                    if selected == ["<all>"]:
+                        filtered_source.update({section: items})
                     else:
-                        for column in attributes:
-                            filtered_columns.append(source_raw["metrics"].get(column, None))                   
-                            filtered_metrics = {"metrics": filtered_columns}
-                            filtered_source.update({"metrics": filtered_metrics})
+                        filtered_source.update({section: {column: items[column] for column in selected if column in items}})
                             
-                filtered_source.update({"folder":source_raw["folder"]})
-                filtered_source.update({"type":source_raw["type"]})
-                filtered_source.update({"source":source_raw["source"]})
+                filtered_source.update({"folder":source_raw.get("folder")})
+                filtered_source.update({"type":source_raw.get("type")})
+                filtered_source.update({"source":source_raw.get("source")})
                 self.sources.update({file_name: filtered_source})                    
 
                 
@@ -189,37 +164,51 @@ class SemanticsValidator:
             
         
     
-    def validate_semantics(self, registry_path:str, semantic_path: str):
+    @profiled("semantic.validate")
+    def validate_semantics(self, registry_path:str, semantic_path: DocumentInput,
+                           references: Optional[Iterable[Reference]] = None):
+        """Check every include, calculation and filter reference of a semantics file against its sources.
+
+        ``references`` are the file's references when already extracted
+        (see ``extract_registry_references``); otherwise they are extracted here.
+        """
         
         print_decorated_section(title="Validating Semantics Against Schema...")
 
         self.errors = []  # Reset errors
         
-        with open(semantic_path) as f:
-            yaml = YAML()
-            yaml_file = yaml.load(f)
-            
-        
-        key = list(yaml_file.keys())[0]
-        
-        generated_semantics = yaml_file.get(key)
+        semantic_path = as_source(semantic_path)
+        yaml_file = semantic_path.load()
+
+        format_errors = root_errors("semantics", yaml_file)
+        if not format_errors and not isinstance(next(iter(yaml_file.values())), dict):
+            format_errors = validate_body("semantics", next(iter(yaml_file.values())))
+        if format_errors:
+            errors = decipher_error_messages(yaml_path=semantic_path, errors=format_errors)
+            print_decorated_section(title="Semantics Validation Failed", content=errors)
+            return errors
+
+        generated_semantics = next(iter(yaml_file.values()))
         
         sources = generated_semantics.get("source",{})
 
+        if self.source_graph is not None:
+            node = f"semantics.{semantic_path.name}"
+            self.errors.extend(self.source_graph.errors_for(node))
+
         self._get_sources(sources, registry_path)
         
-        source_columns = self._parse_sources()
-        
-        
         attributes = generated_semantics.get("attributes", {})
         metrics = generated_semantics.get("metrics", {})
 
-        attribute_keys = list(attributes.keys())
-        metrics_keys = list(metrics.keys())
-        reference_columns = attribute_keys + metrics_keys + source_columns
+        # Built once per file; every include/calculation/filter lookup is O(1).
+        reference_columns = ReferenceIndex.build(attributes.keys(), metrics.keys(), self.sources)
 
-        self._validate_item(attributes, reference_columns, "attributes")
-        self._validate_item(metrics, reference_columns, "metrics")
+        count("semantic.items", len(attributes or ()) + len(metrics or ()))
+        with phase("semantic.references"):
+            if references is None:
+                references = iter_references(generated_semantics)
+            self._validate_references(references, generated_semantics, reference_columns)
 
         if self.errors:
             errors = decipher_error_messages(yaml_path=semantic_path, errors=self.errors)
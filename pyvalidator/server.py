@@ -0,0 +1,350 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from logger.log import init_worker_logging, log_queue
+from pyvalidator.ddl_index import DDLIndex
+from pyvalidator.document_cache import document_cache, load_yaml
+from pyvalidator.document_source import DocumentSource
+from pyvalidator.format_validator import validate_schema_format, validate_semantic_format
+from pyvalidator.helpers import set_section_output
+from pyvalidator.results import collect_issues, match_issues
+from pyvalidator.runner import (forget_cached, load_ddl_index, load_registry, load_source_graph, resolve_yaml_path,
+                                validate_schema_entry, validate_semantics_entry)
+from pyvalidator.schema_validator import SchemaValidator
+from pyvalidator.semantic_validator import SemanticsValidator
+from pyvalidator.source_graph import source_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Method name -> kind of document it validates.
+METHODS = {
+    "validate_schema_format": "schema",
+    "validate_semantic_format": "semantics",
+    "validate_schema": "schema",
+    "validate_semantics": "semantics",
+    "validate": None,
+}
+
+
+class RequestError(ValueError):
+    """A request the service cannot handle: unknown method or bad parameters."""
+
+
+def _text(params: Dict, key: str) -> str:
+    value = params.get(key)
+    if not isinstance(value, str):
+        raise RequestError(f"'{key}' must be a string")
+    return value
+
+
+def _document(content, path: str, what: str) -> DocumentSource:
+    # YAML text keeps line numbers in the messages; a JSON object is used as the parsed document.
+    if isinstance(content, str):
+        return DocumentSource.from_text(content, path=path)
+    if isinstance(content, dict):
+        return DocumentSource.from_mapping(content, path=path)
+    raise RequestError(f"{what} must be YAML text or a JSON object")
+
+
+def _request_documents(metadata_path: str, kind: str, name: str, params: Dict) -> Dict[str, DocumentSource]:
+    """Every registry path the request replaces, with its in-memory document; the validated one first."""
+    folder = "schema" if kind == "schema" else "semantics"
+    path = resolve_yaml_path(os.path.join(metadata_path, folder), name)
+    documents = {path: _document(params.get("content"), path, "'content'")}
+    sources = params.get("sources") or {}
+    if not isinstance(sources, dict):
+        raise RequestError("'sources' must map source keys (schema.X, semantics.Y) to documents")
+    for source_key, content in sources.items():
+        if source_key.partition(".")[0] not in ("schema", "semantics"):
+            raise RequestError(f"Invalid source '{source_key}'")
+        path = source_path(metadata_path, source_key)
+        documents[path] = _document(content, path, f"Source '{source_key}'")
+    return documents
+
+
+def _validate(settings: Tuple, method: str, kind: str, name: str, document: DocumentSource, params: Dict):
+    metadata_path, ddl_dir, ddl_dump, dialect = settings
+    if method == "validate_schema_format":
+        return validate_schema_format(document)
+    if method == "validate_semantic_format":
+        return validate_semantic_format(document)
+    if method == "validate_schema":
+        if params.get("ddl") is not None:
+            ddl_index = DDLIndex.from_ddl(_text(params, "ddl"))
+        else:
+            ddl_index = load_ddl_index(ddl_dump or os.path.join(metadata_path, ddl_dir, name + ".sql"))
+        return SchemaValidator(ddl_index=ddl_index, dialect=dialect).validate_schema(document)
+    if method == "validate_semantics":
+        validator = SemanticsValidator(source_graph=load_source_graph(metadata_path))
+        return validator.validate_semantics(metadata_path, document)
+    if kind == "schema":
+        return validate_schema_entry(metadata_path, name, ddl_dir, ddl_dump, dialect)["errors"]
+    return validate_semantics_entry(metadata_path, name)["errors"]
+
+
+def handle_request(settings: Tuple, method: str, params: Dict) -> Dict:
+    """Validate the document in ``params`` against the registry in ``settings``.
+
+    ``params`` holds ``name`` (the registry entry), ``content`` (its YAML
+    text or a JSON object), optionally ``sources`` ({source key: document})
+    standing in for registry files it reads, and for ``validate_schema`` an
+    optional ``ddl``. Nothing is read from or written to the validated paths
+    on disk. Runs in a pool worker; the result has the runner's result shape.
+    """
+    if method not in METHODS:
+        raise RequestError(f"Unknown method '{method}'. Expected one of: {', '.join(METHODS)}")
+    if not isinstance(params, dict):
+        raise RequestError("Parameters must be an object")
+    name = _text(params, "name")
+    kind = METHODS[method] or params.get("kind")
+    if kind not in ("schema", "semantics"):
+        raise RequestError("'kind' must be 'schema' or 'semantics'")
+
+    metadata_path = settings[0]
+    documents = _request_documents(metadata_path, kind, name, params)
+    path, document = next(iter(documents.items()))
+    graph = load_source_graph(metadata_path)
+    source_keys = [f"{kind}.{name}"] + list(params.get("sources") or {})
+
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf), collect_issues() as collected:
+            with document_cache.virtual(documents):
+                # The graph re-reads these nodes from memory now and from disk again below.
+                for source_key in source_keys:
+                    graph.invalidate(source_key)
+                try:
+                    errors = _validate(settings, method, kind, name, document, params)
+                except RequestError:
+                    raise
+                except Exception as e:
+                    errors = [f"Validation aborted: {type(e).__name__}: {e}"]
+    finally:
+        for source_key in source_keys:
+            graph.invalidate(source_key)
+
+    result = {"kind": kind, "name": name, "path": path, "errors": errors or []}
+    result["issues"] = [issue.to_dict() for issue in match_issues(result, collected)]
+    return result
+
+
+def _ready():
+    return os.getpid()
+
+
+class ValidationService():
+    """A registry held in memory and a pool of workers validating documents against it.
+
+    With one worker requests run one at a time on a thread of this process.
+    With more they go to forked processes that inherit the loaded registry.
+    Either way no two requests share a worker at the same time, so the
+    caches need no locking.
+    """
+
+    def __init__(self, metadata_path: str, ddl_dir: str = "ddl", ddl_dump: Optional[str] = None, workers: int = 1,
+                 dialect: Optional[str] = None):
+        self.metadata_path = metadata_path
+        self.ddl_dir = ddl_dir
+        self.ddl_dump = ddl_dump
+        self.dialect = dialect
+        self.workers = max(1, workers)
+        self.names: List[str] = []
+        self.executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> Tuple:
+        return (self.metadata_path, self.ddl_dir, self.ddl_dump, self.dialect)
+
+    def _warm(self):
+        # Requests carry everything in their results; nobody reads the console sections.
+        os.environ["PYVALIDATOR_NO_SECTIONS"] = "1"
+        set_section_output(None)
+        self.names = load_registry(self.metadata_path)
+        for name in self.names:
+            for folder in ("schema", "semantics"):
+                try:
+                    load_yaml(resolve_yaml_path(os.path.join(self.metadata_path, folder), name))
+                except Exception:
+                    pass
+        graph = load_source_graph(self.metadata_path)
+        for node in graph.topological_order():
+            try:
+                graph.resolve(node)
+            except OSError:
+                pass
+        if self.ddl_dump:
+            load_ddl_index(self.ddl_dump)
+
+    def _start_executor(self):
+        if self.workers == 1:
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyvalidator-worker")
+        options = {}
+        queue = log_queue()
+        if queue is not None and hasattr(queue, "cancel_join_thread"):
+            options = {"initializer": init_worker_logging, "initargs": (queue, logging.getLogger().level)}
+        executor = ProcessPoolExecutor(max_workers=self.workers, **options)
+        # Fork every worker now, while the freshly loaded registry is there to inherit.
+        for future in [executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def start(self):
+        with self._lock:
+            self._warm()
+            self.executor = self._start_executor()
+        logger.info("Loaded %d registry entries from %s (%d worker(s))",
+                    len(self.names), self.metadata_path, self.workers)
+
+    def reload(self):
+        """Re-read the registry from disk and replace the workers.
+
+        The old workers are drained first: requests already submitted finish
+        against the old registry before any cache is cleared, and requests
+        arriving meanwhile wait until the new workers are up.
+        """
+        with self._lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+            forget_cached(self.metadata_path, self.ddl_dump)
+            document_cache.invalidate()
+            self._warm()
+            self.executor = self._start_executor()
+
+    def submit(self, method: str, params: Dict) -> Future:
+        if method == "reload":
+            future = Future()
+            self.reload()
+            future.set_result({"entries": len(self.names)})
+            return future
+        with self._lock:
+            return self.executor.submit(handle_request, self.settings, method, params)
+
+    def call(self, method: str, params: Dict) -> Dict:
+        return self.submit(method, params).result()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """``POST /<method>`` with the parameters as a JSON object; ``GET /health`` for a liveness check."""
+
+    server_version = "pyvalidator"
+
+    def _send(self, status: int, body: Dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            service = self.server.service
+            self._send(200, {"status": "ok", "metadata_path": service.metadata_path, "entries": len(service.names)})
+        else:
+            self._send(404, {"error": {"message": f"Not found: {self.path}"}})
+
+    def do_POST(self):
+        method = self.path.strip("/")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(length) or b"{}")
+            result = self.server.service.call(method, params)
+        except (RequestError, json.JSONDecodeError) as e:
+            status = 404 if method not in METHODS and method != "reload" else 400
+            self._send(status, {"error": {"message": str(e)}})
+        except Exception as e:
+            logger.exception("Request %s failed", method)
+            self._send(500, {"error": {"message": f"{type(e).__name__}: {e}"}})
+        else:
+            self._send(200, {"result": result})
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve_http(service: ValidationService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Serve JSON over HTTP until interrupted. Each connection gets a thread; validation runs on the pool."""
+    server = ThreadingHTTPServer((host, port), _RequestHandler)
+    server.service = service
+    logger.info("Serving on http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+def serve_stdio(service: ValidationService, stdin: TextIO = None, stdout: TextIO = None):
+    """Serve JSON-RPC 2.0, one message per line, until ``stdin`` closes.
+
+    Requests are handed to the pool as they arrive, so responses can come
+    back out of order; match them by ``id``.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    write_lock = threading.Lock()
+    pending: List[Future] = []
+
+    def respond(message: Dict):
+        with write_lock:
+            stdout.write(json.dumps(dict(message, jsonrpc="2.0")) + "\n")
+            stdout.flush()
+
+    def error(request_id, code: int, message: str):
+        respond({"id": request_id, "error": {"code": code, "message": message}})
+
+    def on_done(request_id, method: str, future: Future):
+        try:
+            result = future.result()
+        except RequestError as e:
+            error(request_id, METHOD_NOT_FOUND if method not in METHODS else INVALID_PARAMS, str(e))
+        except Exception as e:
+            logger.exception("Request %s failed", method)
+            error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            if request_id is not None:
+                respond({"id": request_id, "result": result})
+
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            error(None, PARSE_ERROR, f"Parse error: {e}")
+            continue
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            error(request.get("id") if isinstance(request, dict) else None, INVALID_REQUEST, "Invalid request")
+            continue
+        request_id, method = request.get("id"), request["method"]
+        future = service.submit(method, request.get("params") or {})
+        future.add_done_callback(lambda future, request_id=request_id, method=method: on_done(request_id, method, future))
+        pending.append(future)
+
+    for future in pending:
+        future.exception()
@@ -0,0 +1,177 @@
+import os
+from typing import Dict, List, Optional
+
+from pyvalidator.document_cache import load_plain_yaml, load_yaml
+
+
+def resolve_yaml_path(directory: str, name: str) -> str:
+    """Return the ``.yaml`` or ``.yml`` file for ``name``, preferring whichever exists."""
+    for extension in (".yaml", ".yml"):
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            return path
+    return os.path.join(directory, name + ".yaml")
+
+
+def source_path(metadata_path: str, source_key: str) -> str:
+    """Path of the file a ``schema.X`` / ``semantics.Y`` source entry refers to."""
+    source_type, _, file_name = source_key.partition(".")
+    return resolve_yaml_path(os.path.join(metadata_path, source_type), file_name)
+
+
+def load_plain_source(path: str) -> Dict:
+    """Load a source file as plain dicts and lists, without ruamel comment data."""
+    return load_plain_yaml(path)
+
+
+def _source_keys(document) -> List[str]:
+    try:
+        generated_semantics = document.get(list(document.keys())[0])
+        return list((generated_semantics.get("source") or {}).keys())
+    except Exception:
+        return []
+
+
+class SourceGraph():
+    """Registry-wide graph of semantics files and the sources they reference.
+
+    Nodes are source keys (``schema.game``, ``semantics.player``); each
+    semantics node points at the sources in its ``source:`` block. Every
+    source is loaded and normalized once and shared by all semantics that
+    reference it. Cycles between semantics are recorded as structured errors
+    on each node taking part in them.
+    """
+
+    def __init__(self, metadata_path: str):
+        self.metadata_path = metadata_path
+        self.edges: Dict[str, List[str]] = {}
+        self.cycle_errors: Dict[str, List[Dict]] = {}
+        self._resolved: Dict[str, Dict] = {}
+        self._failed: Dict[str, OSError] = {}
+        self._order: Optional[List[str]] = None
+
+    @classmethod
+    def from_registry(cls, metadata_path: str, names: List[str]) -> "SourceGraph":
+        graph = cls(metadata_path)
+        for name in names:
+            graph.add(f"semantics.{name}")
+        return graph
+
+    def add(self, node: str):
+        """Add a node and, for semantics, every source reachable from it."""
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            if current in self.edges:
+                continue
+            self._order = None
+            if not current.startswith("semantics."):
+                self.edges[current] = []
+                continue
+            try:
+                document = load_yaml(source_path(self.metadata_path, current))
+            except Exception:
+                document = None
+            self.edges[current] = _source_keys(document) if document else []
+            pending.extend(self.edges[current])
+
+    def resolve(self, source_key: str) -> Dict:
+        """Return the normalized content of a source, loading it on first use.
+
+        Raises ``FileNotFoundError`` (every time) for a missing source file.
+        """
+        if source_key in self._resolved:
+            return self._resolved[source_key]
+        if source_key in self._failed:
+            raise self._failed[source_key]
+        try:
+            resolved = load_plain_source(source_path(self.metadata_path, source_key))
+        except OSError as e:
+            self._failed[source_key] = e
+            raise
+        self._resolved[source_key] = resolved
+        return resolved
+
+    def invalidate(self, source_key: str):
+        """Forget what was loaded for ``source_key`` after its file changed.
+
+        A semantics node also has its ``source:`` edges re-read.
+        """
+        self._resolved.pop(source_key, None)
+        self._failed.pop(source_key, None)
+        if source_key.startswith("semantics.") and source_key in self.edges:
+            del self.edges[source_key]
+            self.add(source_key)
+        self._order = None
+
+    def dependents(self, source_key: str) -> List[str]:
+        """Semantics nodes that read ``source_key`` directly or through other semantics, in dependency order."""
+        readers: Dict[str, List[str]] = {}
+        for node, sources in self.edges.items():
+            for source in sources:
+                readers.setdefault(source, []).append(node)
+        found = set()
+        pending = list(readers.get(source_key, []))
+        while pending:
+            node = pending.pop()
+            if node in found:
+                continue
+            found.add(node)
+            pending.extend(readers.get(node, []))
+        return [node for node in self.topological_order() if node in found]
+
+    def topological_order(self) -> List[str]:
+        """Nodes ordered so that every source comes before the semantics using it."""
+        if self._order is not None:
+            return self._order
+
+        order = []
+        state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
+        self.cycle_errors = {}
+
+        for root in self.edges:
+            if state.get(root):
+                continue
+            path = [root]
+            iterators = [iter(self.edges[root])]
+            state[root] = 1
+            while iterators:
+                child = next(iterators[-1], None)
+                if child is None:
+                    iterators.pop()
+                    done = path.pop()
+                    state[done] = 2
+                    order.append(done)
+                    continue
+                if state.get(child) == 1:
+                    self._record_cycle(path[path.index(child):] + [child])
+                    continue
+                if state.get(child) == 2 or child not in self.edges:
+                    continue
+                state[child] = 1
+                path.append(child)
+                iterators.append(iter(self.edges[child]))
+
+        self._order = order
+        return order
+
+    def _record_cycle(self, cycle: List[str]):
+        description = " -> ".join(cycle)
+        for node, dependency in zip(cycle, cycle[1:]):
+            self.cycle_errors.setdefault(node, []).append({
+                "loc": ("source", dependency),
+                "type": "source_cycle",
+                "msg": f"Circular source reference: {description}"
+            })
+
+    def errors_for(self, node: str) -> List[Dict]:
+        self.topological_order()
+        return self.cycle_errors.get(node, [])
+
+    def semantics_order(self, names: List[str]) -> List[str]:
+        """Registry semantics names in dependency order."""
+        wanted = set(names)
+        ordered = [node.partition(".")[2] for node in self.topological_order()
+                   if node.startswith("semantics.") and node.partition(".")[2] in wanted]
+        seen = set(ordered)
+        return ordered + [name for name in names if name not in seen]
@@ -0,0 +1,106 @@
+import re
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+
+
+GENERIC_TYPE_FAMILIES = {
+    "NUMBER": {"DECIMAL", "FLOAT", "NUMBER", "DOUBLE", "NUMERIC"},
+    "INT": {"INT", "INTEGER", "BIGINT", "SMALLINT"},
+    "VARCHAR": {"VARCHAR", "TEXT", "STRING", "CHAR"},
+    "DATE": {"DATE", "DATETIME", "TIMESTAMP"}
+}
+
+# Extra aliases per dialect, merged over the generic families.
+DIALECT_TYPE_FAMILIES = {
+    "generic": {},
+    "postgres": {
+        "NUMBER": {"REAL", "DOUBLE PRECISION", "FLOAT4", "FLOAT8", "MONEY"},
+        "INT": {"INT2", "INT4", "INT8", "SERIAL", "BIGSERIAL", "SMALLSERIAL"},
+        "VARCHAR": {"CHARACTER", "CHARACTER VARYING", "BPCHAR", "CITEXT"},
+        "DATE": {"TIMESTAMPTZ", "TIMESTAMP WITH TIME ZONE", "TIMESTAMP WITHOUT TIME ZONE"},
+        "BOOLEAN": {"BOOLEAN", "BOOL"},
+    },
+    "snowflake": {
+        "NUMBER": {"REAL", "FLOAT4", "FLOAT8", "DOUBLE PRECISION"},
+        "INT": {"TINYINT", "BYTEINT"},
+        "VARCHAR": {"CHARACTER", "NCHAR", "NVARCHAR", "NVARCHAR2", "CHAR VARYING", "NCHAR VARYING"},
+        "DATE": {"TIMESTAMP_NTZ", "TIMESTAMP_LTZ", "TIMESTAMP_TZ", "TIMESTAMPNTZ", "TIMESTAMPLTZ", "TIMESTAMPTZ"},
+        "BOOLEAN": {"BOOLEAN"},
+    },
+    "mysql": {
+        "NUMBER": {"REAL", "DOUBLE PRECISION", "DEC", "FIXED"},
+        "INT": {"TINYINT", "MEDIUMINT"},
+        "VARCHAR": {"TINYTEXT", "MEDIUMTEXT", "LONGTEXT", "NCHAR", "NVARCHAR"},
+        "DATE": {"TIME", "YEAR"},
+        "BOOLEAN": {"BOOLEAN", "BOOL"},
+    },
+}
+
+_PARAMETERS = re.compile(r"\s*\(.*?\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_type(type_name: str) -> str:
+    """``decimal(10, 2)`` -> ``DECIMAL``, ``character  varying(255)`` -> ``CHARACTER VARYING``."""
+    return _WHITESPACE.sub(" ", _PARAMETERS.sub("", type_name)).strip().upper()
+
+
+class TypeSystem():
+    """Maps column types to a canonical family id for one SQL dialect.
+
+    Type parameters are stripped before the lookup, and a type outside every
+    family is its own family, so unknown types still compare by name. Both
+    the canonical form of each type and the verdict for each (ddl, schema)
+    pair are memoized, so a wide table costs one dict lookup per column.
+    """
+
+    def __init__(self, families: Mapping[str, Iterable[str]], name: str = "custom"):
+        self.name = name
+        self.families = {family: frozenset(aliases) for family, aliases in families.items()}
+        self._family: Dict[str, str] = {}
+        for family, aliases in self.families.items():
+            for alias in aliases:
+                self._family[normalize_type(alias)] = family
+        self._canonical: Dict[str, str] = {}
+        self._pairs: Dict[Tuple[str, str], bool] = {}
+
+    def canonical(self, type_name: str) -> str:
+        canonical = self._canonical.get(type_name)
+        if canonical is None:
+            normalized = normalize_type(type_name)
+            canonical = self._canonical[type_name] = self._family.get(normalized, normalized)
+        return canonical
+
+    def equivalent(self, ddl_type: str, schema_type: str) -> bool:
+        key = (ddl_type, schema_type)
+        verdict = self._pairs.get(key)
+        if verdict is None:
+            verdict = self._pairs[key] = self.canonical(ddl_type) == self.canonical(schema_type)
+        return verdict
+
+    def __repr__(self):
+        return f"TypeSystem({self.name!r}, families={len(self.families)})"
+
+
+def dialect_families(dialect: str) -> Dict[str, set]:
+    try:
+        extra = DIALECT_TYPE_FAMILIES[dialect]
+    except KeyError:
+        raise ValueError(f"Unknown SQL dialect '{dialect}'. Expected one of: {', '.join(DIALECT_TYPE_FAMILIES)}")
+    families = {family: set(aliases) for family, aliases in GENERIC_TYPE_FAMILIES.items()}
+    for family, aliases in extra.items():
+        families.setdefault(family, set()).update(aliases)
+    return families
+
+
+_type_systems: Dict[str, TypeSystem] = {}
+
+
+def get_type_system(dialect: Optional[Union[str, TypeSystem]] = None) -> TypeSystem:
+    """Shared ``TypeSystem`` for a dialect name, so its memo is reused across validators."""
+    if isinstance(dialect, TypeSystem):
+        return dialect
+    dialect = (dialect or "generic").lower()
+    type_system = _type_systems.get(dialect)
+    if type_system is None:
+        type_system = _type_systems[dialect] = TypeSystem(dialect_families(dialect), name=dialect)
+    return type_system
@@ -0,0 +1,268 @@
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pyvalidator.runner import KINDS, forget_cached, load_registry, load_source_graph, run_entry, run_registry
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+WATCHED_EXTENSIONS = (".yaml", ".yml", ".sql")
+DEFAULT_INTERVAL = 0.5
+# Editors often write a file in several steps; changes this close together are handled as one batch.
+SETTLE_SECONDS = 0.05
+
+
+class WarmRegistry():
+    """A registry whose parsed documents, DDL catalogue and source graph stay in memory between runs.
+
+    ``revalidate`` maps changed files to the registry entries they affect
+    (the entry itself and every semantics reading it, directly or through
+    other semantics) and validates only those, in-process, so everything
+    unchanged is served from the warm caches.
+    """
+
+    def __init__(self, metadata_path: str, kinds=KINDS, ddl_dir: str = "ddl", ddl_dump: Optional[str] = None,
+                 dialect: Optional[str] = None):
+        self.metadata_path = metadata_path
+        self.kinds = kinds
+        self.ddl_dir = ddl_dir
+        self.ddl_dump = ddl_dump
+        self.dialect = dialect
+        self.names: List[str] = []
+
+    def _folder(self, name: str) -> str:
+        return os.path.abspath(os.path.join(self.metadata_path, name))
+
+    def _task(self, kind: str, name: str) -> Tuple:
+        return (kind, self.metadata_path, name, self.ddl_dir, self.ddl_dump, self.dialect)
+
+    def validate_all(self) -> List[Dict]:
+        forget_cached(self.metadata_path, self.ddl_dump)
+        self.names = load_registry(self.metadata_path)
+        return run_registry(self.metadata_path, kinds=self.kinds, workers=1,
+                            ddl_dir=self.ddl_dir, ddl_dump=self.ddl_dump, dialect=self.dialect)
+
+    def affected(self, paths: Iterable[str]) -> Optional[List[Tuple]]:
+        """Runner tasks to repeat after ``paths`` changed, or ``None`` when the registry itself changed."""
+        schemas: Set[str] = set()
+        sources: Set[str] = set()
+        for path in paths:
+            path = os.path.abspath(path)
+            folder, file_name = os.path.split(path)
+            name, extension = os.path.splitext(file_name)
+            if path == os.path.join(self._folder("."), "registry.yml"):
+                return None
+            if self.ddl_dump and path == os.path.abspath(self.ddl_dump):
+                forget_cached(ddl_dump=self.ddl_dump)
+                schemas.update(self.names)
+            elif folder == self._folder(self.ddl_dir) and extension == ".sql" and not self.ddl_dump:
+                schemas.add(name)
+            elif folder == self._folder("schema") and extension in (".yaml", ".yml"):
+                schemas.add(name)
+                sources.add(f"schema.{name}")
+            elif folder == self._folder("semantics") and extension in (".yaml", ".yml"):
+                sources.add(f"semantics.{name}")
+
+        graph = load_source_graph(self.metadata_path)
+        semantics: Set[str] = set()
+        for source_key in sources:
+            graph.invalidate(source_key)
+        for source_key in sources:
+            if source_key.startswith("semantics."):
+                semantics.add(source_key.partition(".")[2])
+            semantics.update(node.partition(".")[2] for node in graph.dependents(source_key))
+
+        tasks = []
+        if "schema" in self.kinds:
+            tasks.extend(self._task("schema", name) for name in self.names if name in schemas)
+        if "semantics" in self.kinds:
+            tasks.extend(self._task("semantics", name) for name in graph.semantics_order(self.names)
+                         if name in semantics)
+        return tasks
+
+    def revalidate(self, paths: Iterable[str]) -> List[Dict]:
+        tasks = self.affected(paths)
+        if tasks is None:
+            return self.validate_all()
+        return [run_entry(task) for task in tasks]
+
+
+class PollingWatcher():
+    """Detects changed files by comparing mtime and size snapshots every ``interval`` seconds."""
+
+    backend = "polling"
+
+    def __init__(self, roots: Iterable[str], interval: float = DEFAULT_INTERVAL):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                paths = [root]
+            else:
+                paths = (os.path.join(folder, file_name)
+                         for folder, _, file_names in os.walk(root)
+                         for file_name in file_names if file_name.endswith(WATCHED_EXTENSIONS))
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until something changed (or ``timeout`` passed) and return the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class _EventQueue(FileSystemEventHandler):
+    def __init__(self, events: "queue.Queue[str]"):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path and path.endswith(WATCHED_EXTENSIONS):
+                self.events.put(os.path.abspath(path))
+
+
+class NativeWatcher():
+    """File system notifications (inotify, FSEvents, ...) through the optional ``watchdog`` package."""
+
+    backend = "watchdog"
+
+    def __init__(self, roots: Iterable[str]):
+        self.events: "queue.Queue[str]" = queue.Queue()
+        self.observer = Observer()
+        handler = _EventQueue(self.events)
+        for root in roots:
+            if os.path.isfile(root):
+                # Files are watched through their folder; unrelated files there are ignored later.
+                self.observer.schedule(handler, os.path.dirname(os.path.abspath(root)), recursive=False)
+            else:
+                self.observer.schedule(handler, root, recursive=True)
+        self.observer.start()
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        try:
+            changed = {self.events.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+        time.sleep(SETTLE_SECONDS)
+        while True:
+            try:
+                changed.add(self.events.get_nowait())
+            except queue.Empty:
+                return changed
+
+    def close(self):
+        self.observer.stop()
+        self.observer.join()
+
+
+def create_watcher(roots: Iterable[str], interval: float = DEFAULT_INTERVAL, polling: bool = False):
+    """Native notifications when ``watchdog`` is installed, polling otherwise."""
+    roots = list(roots)
+    if Observer is not None and not polling:
+        return NativeWatcher(roots)
+    return PollingWatcher(roots, interval)
+
+
+class ResultBroadcaster():
+    """Text stream that copies every write to all clients connected to a local socket.
+
+    ``address`` is ``host:port`` for TCP or a file system path for a Unix
+    socket. Clients that disconnect are dropped silently.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        host, _, port = address.rpartition(":")
+        if port.isdigit() and host:
+            self.server = socket.create_server((host, int(port)))
+            self._unix_path = None
+        else:
+            if os.path.exists(address):
+                os.remove(address)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(address)
+            self.server.listen()
+            self._unix_path = address
+        self.clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept, name="pyvalidator-watch-accept", daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.clients.append(client)
+
+    def write(self, text: str):
+        data = text.encode()
+        with self._lock:
+            for client in list(self.clients):
+                try:
+                    client.sendall(data)
+                except OSError:
+                    self.clients.remove(client)
+                    client.close()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.server.close()
+        with self._lock:
+            for client in self.clients:
+                client.close()
+            self.clients = []
+        if self._unix_path and os.path.exists(self._unix_path):
+            os.remove(self._unix_path)
+
+
+def watch(registry: WarmRegistry, watcher, emit: Callable[[List[Dict], float], None],
+          stop: Optional[threading.Event] = None):
+    """Validate ``registry`` once, then again for every batch of changes until ``stop`` is set."""
+    start = time.perf_counter()
+    emit(registry.validate_all(), time.perf_counter() - start)
+    while stop is None or not stop.is_set():
+        changed = watcher.wait(timeout=1.0)
+        if not changed:
+            continue
+        logger.debug("Changed: %s", ", ".join(sorted(changed)))
+        start = time.perf_counter()
+        results = registry.revalidate(changed)
+        if results:
+            emit(results, time.perf_counter() - start)
@@ -1,11 +1,10 @@
 from pyvalidator.format_validator import validate_schema_format
 from pyvalidator.schema_validator import main as validate_schema_ddl
-from ruamel.yaml import YAML
+from pyvalidator.document_cache import document_cache, load_yaml
 import os
 from logger.log import create_logger
 
 logger = create_logger()
-yaml = YAML()
 
 metadata_path = "./assets/adventure_metadata"
 
@@ -13,9 +12,8 @@ ddl_path = os.path.join(metadata_path,"ddl")
 schema_path = os.path.join(metadata_path,"schema")
 registry_path = os.path.join(metadata_path,"registry.yml")
 
-with open(registry_path,'r') as f:
-   registry = yaml.load(f)
-   registries = registry.get("registered_yml", None)
+registry = load_yaml(registry_path)
+registries = registry.get("registered_yml", None)
    
    
 for registry in registries:
@@ -34,3 +32,5 @@ for registry in registries:
    if ddl_errors:
       for msg in ddl_errors:
          logger.error("Schema: %s | %s", registry, msg)
+
+logger.info("Document cache: %s", document_cache.stats())
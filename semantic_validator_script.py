@@ -1,18 +1,16 @@
 from pyvalidator.format_validator import validate_semantic_format
 from pyvalidator.semantic_validator import SemanticsValidator
-from ruamel.yaml import YAML
+from pyvalidator.document_cache import document_cache, load_yaml
 from logger.log import create_logger
 import os
 
-yaml = YAML()
 logger = create_logger()
 
 metadata_path = "./assets/"
 registry_path = os.path.join(metadata_path,"registry.yml")
 
-with open(registry_path,'r') as f:
-   registry = yaml.load(f)
-   registries = registry.get("registered_yml", None)
+registry = load_yaml(registry_path)
+registries = registry.get("registered_yml", None)
 
 
 for registry in registries:
@@ -32,4 +30,6 @@ for registry in registries:
     
     if semantic_errors:
         for msg in semantic_errors:
-            logger.error("Semantic: %s|%s",registry, msg )      
\ No newline at end of file
+            logger.error("Semantic: %s|%s",registry, msg )      
+
+logger.info("Document cache: %s", document_cache.stats())
@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+from pyvalidator.ddl_cache import DDLCache
+
+DDL = "CREATE TABLE t (id INT);"
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", b"\x80\x04cno_such_module\nThing\n."])
+def test_unreadable_entries_are_dropped_misses(tmp_path, content):
+    cache = DDLCache(str(tmp_path))
+    cache.put(DDL, [{"table_name": "t"}])
+    path = cache._entry_path(cache.key(DDL))
+    with open(path, "wb") as f:
+        f.write(content)
+
+    assert cache.get(DDL) is None
+    assert cache.misses == 1 and not os.path.exists(path)
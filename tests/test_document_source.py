@@ -0,0 +1,11 @@
+from pyvalidator.document_cache import document_cache
+from pyvalidator.document_source import DocumentSource
+
+
+def test_line_text_reads_the_virtual_document(tmp_path):
+    path = tmp_path / "orders.yaml"
+    path.write_text("orders:\n  on disk: 1\n")
+    source = DocumentSource.from_path(str(path))
+    with document_cache.virtual({str(path): DocumentSource.from_text("orders:\n  in memory: 1\n")}):
+        assert source.line_text(2) == "  in memory: 1"
+    assert source.line_text(2) == "  on disk: 1\n"
@@ -0,0 +1,57 @@
+import pytest
+
+from pyvalidator.ddl_index import DDLIndex
+from pyvalidator.document_source import DocumentSource
+from pyvalidator.format_validator import validate_document, validate_schema_format, validate_semantic_format
+from pyvalidator.helpers import set_section_output
+from pyvalidator.schema_validator import SchemaValidator
+from pyvalidator.semantic_validator import SemanticsValidator
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    set_section_output(None)
+    yield
+    set_section_output()
+
+
+@pytest.mark.parametrize("kind", ["schema", "semantics"])
+@pytest.mark.parametrize("document", [{}, "{}", b"{}"])
+def test_validate_document_reports_empty_documents(kind, document):
+    errors = validate_document(kind, document)
+    assert [error["type"] for error in errors] == ["empty_document"]
+
+
+@pytest.mark.parametrize("validate, label", [(validate_schema_format, "Schema"),
+                                             (validate_semantic_format, "Semantics")])
+@pytest.mark.parametrize("source", [DocumentSource.from_mapping({}), DocumentSource.from_text(""),
+                                    DocumentSource.from_text("{}")])
+def test_format_validators_report_empty_documents(validate, label, source):
+    errors = validate(source)
+    assert len(errors) == 1 and errors[0].startswith(f"{label} document is empty")
+
+
+def test_format_validators_reject_a_non_mapping_root():
+    errors = validate_schema_format(DocumentSource.from_text("- flags\n"))
+    assert len(errors) == 1 and "only one key at the top level" in errors[0]
+
+
+def test_format_validators_report_empty_files(tmp_path):
+    path = tmp_path / "empty.yaml"
+    path.write_text("")
+    errors = validate_schema_format(str(path))
+    assert len(errors) == 1 and errors[0].startswith("Schema document is empty")
+
+
+@pytest.mark.parametrize("source", [DocumentSource.from_mapping({}), DocumentSource.from_text(""),
+                                    DocumentSource.from_text("- flags\n")])
+def test_content_validators_report_broken_roots(tmp_path, source):
+    schema_errors = SchemaValidator(ddl_index=DDLIndex.from_ddl("CREATE TABLE t (id INT);")).validate_schema(source)
+    semantics_errors = SemanticsValidator().validate_semantics(tmp_path, source)
+    assert len(schema_errors) == 1 and len(semantics_errors) == 1
+
+
+def test_schema_validator_reports_unparsable_schemas():
+    source = DocumentSource.from_mapping({"t": {"table_info": "not a mapping"}})
+    errors = SchemaValidator(ddl_index=DDLIndex.from_ddl("CREATE TABLE t (id INT);")).validate_schema(source)
+    assert errors
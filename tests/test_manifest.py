@@ -0,0 +1,19 @@
+import json
+
+import pytest
+
+from pyvalidator.manifest import MANIFEST_VERSION, ValidationManifest
+
+
+@pytest.mark.parametrize("data", [[], "manifest", 2, None, {"version": MANIFEST_VERSION - 1},
+                                  {"version": MANIFEST_VERSION, "entries": []}])
+def test_unusable_manifests_start_empty(tmp_path, data):
+    path = tmp_path / "manifest.json"
+    validator = ValidationManifest(str(path)).validator
+    if isinstance(data, dict) and "entries" in data:
+        data["validator"] = validator
+    path.write_text(json.dumps(data))
+
+    manifest = ValidationManifest(str(path))
+
+    assert manifest.entries == {} and manifest.dependencies == {}
@@ -0,0 +1,14 @@
+from pyvalidator.source_graph import SourceGraph, source_path
+
+
+def test_source_graph_follows_yml_semantics(tmp_path):
+    (tmp_path / "semantics").mkdir()
+    (tmp_path / "semantics" / "a.yaml").write_text("a:\n  source:\n    semantics.b: {}\n")
+    (tmp_path / "semantics" / "b.yml").write_text("b:\n  source:\n    semantics.a: {}\n")
+
+    graph = SourceGraph.from_registry(str(tmp_path), ["a"])
+    graph.topological_order()
+
+    assert source_path(str(tmp_path), "semantics.b").endswith("b.yml")
+    assert graph.edges["semantics.b"] == ["semantics.a"]
+    assert set(graph.cycle_errors) == {"semantics.a", "semantics.b"}
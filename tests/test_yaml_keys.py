@@ -0,0 +1,89 @@
+import os
+
+import pytest
+import yaml
+
+from pyvalidator.document_cache import document_cache, load_plain_yaml, load_yaml
+from pyvalidator.helpers import set_section_output
+from pyvalidator.reference_index import ReferenceIndex
+from pyvalidator.semantic_validator import SemanticsValidator
+
+SCHEMA = """\
+flags:
+  subject_area: yaml 1.1 booleans
+  table_info:
+  - table: flags
+    joins: []
+  columns:
+    on:
+      name: On
+      type: BOOLEAN
+      column: on
+      desc: Switched on
+    no:
+      name: No
+      type: BOOLEAN
+      column: no
+      desc: Answered no
+    yes:
+      name: Yes
+      type: BOOLEAN
+      column: yes
+      desc: Answered yes
+"""
+
+SEMANTICS = {
+    "flags": {
+        "folder": "flags",
+        "type": "measure",
+        "source": {"schema.flags": {"columns": ["<all>"]}},
+        "attributes": {
+            "answered": {"name": "Answered", "description": "Either answer", "include": ["yes", "no"]},
+            "broken": {"name": "Broken", "description": "Unknown column", "include": ["maybe"]},
+        },
+        "metrics": {
+            "switched": {"name": "Switched", "description": "Rows switched on", "calculation": "SUM([on])"},
+        },
+    }
+}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    for folder in ("schema", "semantics"):
+        os.makedirs(tmp_path / folder)
+    (tmp_path / "schema" / "flags.yaml").write_text(SCHEMA)
+    (tmp_path / "semantics" / "flags.yaml").write_text(yaml.safe_dump(SEMANTICS, sort_keys=False))
+    (tmp_path / "registry.yml").write_text("registered_yml:\n- flags\n")
+    set_section_output(None)
+    document_cache.invalidate()
+    yield str(tmp_path)
+    document_cache.invalidate()
+    set_section_output()
+
+
+def _validate(metadata_path):
+    return SemanticsValidator().validate_semantics(metadata_path, os.path.join(metadata_path, "semantics", "flags.yaml"))
+
+
+def test_plain_load_does_not_depend_on_the_cache(registry):
+    path = os.path.join(registry, "schema", "flags.yaml")
+    uncached = load_plain_yaml(path)
+    load_yaml(path)
+    assert load_plain_yaml(path) == uncached
+    assert list(uncached["flags"]["columns"]) == ["on", "no", "yes"]
+
+
+def test_semantics_results_do_not_depend_on_the_cache(registry):
+    uncached = _validate(registry)
+    document_cache.invalidate()
+    load_yaml(os.path.join(registry, "schema", "flags.yaml"))
+    cached = _validate(registry)
+    assert uncached == cached
+    assert len(uncached) == 1 and "'maybe'" in uncached[0]
+
+
+def test_reference_index_accepts_non_string_keys():
+    index = ReferenceIndex.build([True, 1], [None], {})
+    assert "True" in index and "1" in index and "None" in index
+    assert index.suggest("true") == ("True",)